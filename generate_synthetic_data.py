@@ -1,4 +1,7 @@
+import math
 import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
 
@@ -63,7 +66,7 @@ def generate_synthetic_energy_prices(
     df_60min = (
         df_15min
         .set_index("timestamp")
-        .resample("1H")
+        .resample("1h")
         .mean()
         .reset_index()
     )
@@ -87,5 +90,215 @@ def generate_synthetic_energy_prices(
     print(f"• Coverage    → {days} days (~6 months)")
 
 
+# ======================================================
+# MULTI-NODE GENERATOR
+# ======================================================
+# Sentinel node ids of the random stream shared by all nodes and of the
+# node profiles. A seed sequence is zero-padded, so [seed, node] would be
+# the same stream as chunk 0 of the node, [seed, node, 0]
+_COMMON_STREAM = 2**32 - 1
+_PROFILE_STREAM = 2**32 - 2
+
+
+def _node_profile(seed, node):
+    """
+    Static characteristics of one price node, drawn from its own stream.
+    """
+    rng = np.random.default_rng([seed, _PROFILE_STREAM, node])
+    return {
+        "base_price": rng.uniform(35, 65),
+        "daily_amplitude": rng.uniform(6, 14),
+        "weekly_amplitude": rng.uniform(3, 7),
+        "noise_std": rng.uniform(2, 4),
+        "spike_rate": rng.uniform(0.005, 0.015),
+        "system_spike_scale": rng.uniform(0.5, 1.5),
+    }
+
+
+def _node_chunk_prices(seed, node, chunk, timestamps, profile, correlation):
+    """
+    15-minute prices of one node for one chunk.
+
+    The noise is a mix of a market-wide factor and node noise with weight
+    correlation, so the noise of any two nodes has that correlation;
+    system-wide spikes hit all nodes at the same intervals. Both random
+    streams depend only on (seed, chunk) and (seed, node, chunk), so every
+    chunk can be generated independently and in any order.
+    """
+    n = len(timestamps)
+    common = np.random.default_rng([seed, _COMMON_STREAM, chunk])
+    local = np.random.default_rng([seed, node, chunk])
+
+    common_noise = common.standard_normal(n)
+    system_spikes = np.zeros(n)
+    spike_idx = common.choice(n, size=int(0.005 * n), replace=False)
+    system_spikes[spike_idx] = common.uniform(20, 80, len(spike_idx))
+
+    noise = profile["noise_std"] * (
+        math.sqrt(correlation) * common_noise
+        + math.sqrt(1 - correlation) * local.standard_normal(n)
+    )
+    spikes = np.zeros(n)
+    spike_idx = local.choice(n, size=int(profile["spike_rate"] * n), replace=False)
+    spikes[spike_idx] = local.uniform(20, 80, len(spike_idx))
+
+    hours = timestamps.hour.to_numpy()
+    dayofweek = timestamps.dayofweek.to_numpy()
+    prices = (
+        profile["base_price"]
+        + profile["daily_amplitude"] * np.sin(2 * np.pi * hours / 24)
+        + profile["weekly_amplitude"] * np.sin(2 * np.pi * dayofweek / 7)
+        + noise
+        + profile["system_spike_scale"] * system_spikes
+        + spikes
+    )
+    return np.clip(prices, 0, None).round(2)
+
+
+class _ChunkWriter:
+    """
+    Appends DataFrame chunks to one CSV or Parquet file.
+    """
+
+    def __init__(self, path, file_format):
+        self.path = path
+        self.file_format = file_format
+        self._parquet = None
+        self._started = False
+
+    def write(self, frame):
+        if self.file_format == "csv":
+            frame.to_csv(self.path, mode="a" if self._started else "w",
+                         header=not self._started, index=False)
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self._started = True
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def _generate_node(task):
+    """
+    Write the 15- and 60-minute files of one node, chunk by chunk.
+    """
+    node, start_date, days, output_dir, seed, chunk_days, correlation, file_format = task
+    profile = _node_profile(seed, node)
+    extension = "csv" if file_format == "csv" else "parquet"
+    paths = {
+        resolution: os.path.join(output_dir, resolution, f"node_{node:03d}.{extension}")
+        for resolution in ("15min", "60min")
+    }
+    writers = {resolution: _ChunkWriter(path, file_format) for resolution, path in paths.items()}
+
+    start = pd.Timestamp(start_date)
+    try:
+        for chunk, first_day in enumerate(range(0, days, chunk_days)):
+            chunk_length = min(chunk_days, days - first_day)
+            timestamps = pd.date_range(
+                start=start + pd.Timedelta(days=first_day),
+                periods=chunk_length * 96,
+                freq="15min",
+            )
+            prices = _node_chunk_prices(seed, node, chunk, timestamps, profile, correlation)
+
+            # Chunks hold whole days, so every hour lies within one chunk
+            writers["15min"].write(pd.DataFrame({
+                "timestamp": timestamps,
+                "price_eur_mwh": prices,
+            }))
+            writers["60min"].write(pd.DataFrame({
+                "timestamp": timestamps[::4],
+                "price_eur_mwh": prices.reshape(-1, 4).mean(axis=1),
+            }))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {"node": node, **profile, **{f"path_{key}": path for key, path in paths.items()}}
+
+
+def generate_synthetic_market_prices(
+    start_date="2025-01-01",
+    days=3653,  # ~10 years
+    nodes=100,
+    output_dir=os.path.join("data", "markets"),
+    seed=42,
+    chunk_days=28,
+    correlation=0.7,
+    file_format="csv",
+    workers=None,
+):
+    """
+    Generate correlated synthetic prices for many price nodes.
+
+    Every node has its own base price, seasonal amplitudes, noise level and
+    spike rate, and shares a market-wide noise factor and system spikes with
+    the other nodes. Nodes are generated in parallel worker processes, each
+    writing its files in chunks of chunk_days days, so memory stays bounded
+    by one chunk per worker regardless of days and nodes. The hourly file is
+    aggregated per chunk while streaming.
+
+    The output depends only on (seed, node, chunk): the same arguments give
+    the same files for any number of workers, and node k is identical
+    whether 1 or 100 nodes are generated. Changing chunk_days changes the
+    random streams.
+
+    Files (same columns as generate_synthetic_energy_prices):
+        output_dir/15min/node_<k>.<csv|parquet>
+        output_dir/60min/node_<k>.<csv|parquet>
+        output_dir/nodes.csv (node characteristics and file paths)
+
+    Args:
+        start_date (str): First day.
+        days (int): Number of days.
+        nodes (int): Number of price nodes.
+        output_dir (str): Target directory.
+        seed (int): Base seed.
+        chunk_days (int): Days generated and written at a time.
+        correlation (float): Correlation of the noise of any two nodes,
+            between 0 and 1.
+        file_format (str): "csv", or "parquet" (requires pyarrow).
+        workers (int): Worker processes, default the CPU count.
+
+    Returns:
+        pd.DataFrame: One row per node, as written to nodes.csv.
+    """
+    if file_format not in ("csv", "parquet"):
+        raise ValueError(f"Unknown file_format '{file_format}', expected 'csv' or 'parquet'")
+    if file_format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ImportError("file_format='parquet' requires pyarrow") from e
+    if not 0 <= correlation <= 1:
+        raise ValueError("correlation must be between 0 and 1")
+
+    for resolution in ("15min", "60min"):
+        os.makedirs(os.path.join(output_dir, resolution), exist_ok=True)
+
+    tasks = [
+        (node, start_date, days, output_dir, seed, chunk_days, correlation, file_format)
+        for node in range(nodes)
+    ]
+    workers = max(1, min(workers or os.cpu_count() or 1, nodes))
+    if workers == 1:
+        manifest = [_generate_node(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            manifest = list(executor.map(_generate_node, tasks))
+
+    manifest = pd.DataFrame(manifest)
+    manifest.to_csv(os.path.join(output_dir, "nodes.csv"), index=False)
+    return manifest
+
+
 if __name__ == "__main__":
     generate_synthetic_energy_prices()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import os
+
+from src.benchmarking import compare_results, run_benchmarks, save_results
+from src.instrumentation import tracing
+
+
+def main():
+    # =========================
+    # Configuration
+    # =========================
+    output_folder = "outputs/benchmarks"
+    days = 182  # days of synthetic data
+    repeat = 5
+    workers = None  # None = all CPU cores
+    groups = None  # subset of ["loaders", "optimization", "ml"]
+    compare_with = None  # path of an earlier benchmark JSON
+
+    # =========================
+    # Run and save
+    # =========================
+    results = run_benchmarks(days=days, repeat=repeat, workers=workers, groups=groups)
+    path = save_results(results, output_folder)
+
+    for name, stats in results["benchmarks"].items():
+        extra = ""
+        if "days_per_second" in stats:
+            extra = f"  ({stats['days_per_second']:.0f} days/s)"
+        elif "rows_per_second" in stats:
+            extra = f"  ({stats['rows_per_second']:.0f} rows/s)"
+        print(f"{name:<60} {stats['median'] * 1000:10.2f} ms{extra}")
+    print(f"Results written to {path}")
+
+    # =========================
+    # Compare with an earlier run
+    # =========================
+    if compare_with:
+        print(compare_results(compare_with, path).to_string(index=False))
+
+
+if __name__ == "__main__":
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
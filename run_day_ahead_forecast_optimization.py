@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.preprocessing import load_price_matrix
+from src.day_ahead import day_ahead_features, predict_day_ahead
+from src.modeling import train_lightgbm_model
+from src.backtesting import realized_profit
+from src.optimization_stochastic import optimize_stochastic, sample_residual_scenarios
+from src.instrumentation import tracing
+
+
+def main():
+    # =========================
+    # Configuration
+    # =========================
+    file_path = "data/synthetic_prices_60min.csv"
+    output_folder = "outputs/day_ahead_forecast_optimization"
+    train_ratio = 0.8  # 80% of days train, 20% test
+    gate_closure_hour = 12  # bids for day d are due at noon on day d - 1
+    context_hours = 24
+    model = "1mwh"  # or "2mwh_blocking"
+    n_scenarios = 0  # > 0 adds stochastic dispatch over residual scenarios
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    # =========================
+    # Step 1: Load prices as a (days x periods) matrix
+    # =========================
+    matrix, dates = load_price_matrix(file_path)
+    periods = matrix.shape[1]
+
+    # =========================
+    # Step 2: Day-ahead features (known at gate closure)
+    # =========================
+    X, _ = day_ahead_features(
+        matrix,
+        dates,
+        gate_closure_hour=gate_closure_hour,
+        context_hours=context_hours,
+    )
+    y = matrix.ravel()
+
+    # =========================
+    # Step 3: Train-test split by day
+    # =========================
+    split_day = int(len(dates) * train_ratio)
+    split_idx = split_day * periods
+
+    booster = train_lightgbm_model(
+        X[:split_idx], y[:split_idx],
+        X[split_idx:], y[split_idx:],
+    )
+
+    # =========================
+    # Step 4: Forecast every test day in one call
+    # =========================
+    forecast = predict_day_ahead(booster, X[split_idx:], periods)
+    actual = matrix[split_day:]
+
+    rmse = np.sqrt(np.mean((forecast - actual) ** 2))
+    print(f"Day-ahead RMSE: {rmse:.3f}")
+
+    # =========================
+    # Step 5: Dispatch on the forecast, settle at actual prices
+    # =========================
+    results_df = pd.DataFrame({
+        "date": dates[split_day:],
+        "realized_profit": realized_profit(forecast, actual, model),
+        "perfect_foresight_profit": realized_profit(actual, actual, model),
+    })
+
+    # =========================
+    # Step 6 (optional): Stochastic dispatch over price scenarios
+    # =========================
+    if n_scenarios:
+        # Training-day residuals are in-sample, so they understate the
+        # forecast error of the test days
+        residuals = matrix[:split_day] - predict_day_ahead(
+            booster, X[:split_idx], periods
+        )
+        scenarios = sample_residual_scenarios(forecast, residuals, n_scenarios)
+        stochastic = optimize_stochastic(
+            scenarios, model, point_forecast=forecast, actual=actual
+        )
+        for key in ("expected_profit", "point_expected_profit", "vss", "evpi", "realized_profit"):
+            column = "stochastic_realized_profit" if key == "realized_profit" else key
+            results_df[column] = stochastic[key]
+
+        print(
+            f"Stochastic ({n_scenarios} scenarios): "
+            f"VSS {results_df['vss'].sum():.2f} | EVPI {results_df['evpi'].sum():.2f} | "
+            f"Realized {results_df['stochastic_realized_profit'].sum():.2f}"
+        )
+
+    results_df.to_csv(
+        os.path.join(output_folder, "results.csv"),
+        index=False,
+    )
+
+    print(
+        f"Realized profit: {results_df['realized_profit'].sum():.2f} | "
+        f"Perfect foresight: {results_df['perfect_foresight_profit'].sum():.2f}"
+    )
+
+
+if __name__ == "__main__":
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
@@ -2,8 +2,11 @@ import os
 import pandas as pd
 
 from src.preprocessing import load_and_preprocess_data
-from src.optimization import optimize_battery_milp_1mwh
+from src.optimization import optimize_days
+from src.optimization_cache import SolveCache
+from src.visualization_batch import plot_strategies
 from src.visualization import plot_daily_profits, plot_strategy_1mwh
+from src.instrumentation import tracing
 
 
 def main():
@@ -13,7 +16,10 @@ def main():
     file_path = "data/synthetic_prices_60min.csv"
     output_folder = "outputs/milp_1mwh"
     n_days = 180
+    workers = None  # None = all CPU cores
+    cache_path = ".cache/solves.sqlite"  # None disables the solve cache
     day_index_to_plot = 150
+    strategy_plots = None  # "all", ("top", n) or ("worst", n) days
 
     os.makedirs(output_folder, exist_ok=True)
 
@@ -28,7 +34,7 @@ def main():
     # =========================
     # Step 2: Run MILP optimization
     # =========================
-    results = []
+    valid_days = {}
 
     for date, prices in test_daily_prices.items():
         # Expect hourly prices (24 values per day)
@@ -36,14 +42,30 @@ def main():
             print(f"Skipping {date} due to invalid data.")
             continue
 
-        result = optimize_battery_milp_1mwh(prices)
+        valid_days[date] = prices
+
+    cache = SolveCache(cache_path) if cache_path else None
+    results = []
+
+    for result in optimize_days(
+        valid_days,
+        model="1mwh",
+        workers=workers,
+        cache=cache,
+    ):
+        if "Error" in result:
+            print(f"Optimization failed for {result['date']}: {result['Error']}")
+            continue
 
         results.append({
-            "date": date,
+            "date": result["date"],
             "profit": result["Profit"],
             **result
         })
 
+    if cache is not None:
+        print(f"Solve cache: {cache.stats()}")
+
     # =========================
     # Step 3: Save results
     # =========================
@@ -68,6 +90,19 @@ def main():
     else:
         print("Selected day index out of range.")
 
+    if strategy_plots is not None:
+        index = plot_strategies(
+            results,
+            test_daily_prices,
+            os.path.join(output_folder, "strategies"),
+            kind="1mwh",
+            select=strategy_plots,
+            workers=workers,
+        )
+        print(f"Strategy charts: {index}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
\ No newline at end of file
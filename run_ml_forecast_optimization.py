@@ -2,14 +2,18 @@ import os
 import pandas as pd
 
 from src.preprocessing_ml import load_and_preprocess_data
-from src.feature_engineering import create_lag_features, create_rolling_features
-from src.modeling import train_lightgbm_model
-from src.optimization import optimize_battery_milp_1mwh
+from src.feature_engineering import build_feature_matrix
+from src.modeling import dataset_cache_path, load_params, train_lightgbm_model
+from src.optimization import optimize_days
+from src.optimization_cache import SolveCache
+from src.backtesting import walk_forward_backtest
+from src.visualization_batch import plot_strategies
 from src.visualization import (
     plot_actual_vs_predicted,
     plot_daily_profits,
     plot_strategy_forecast,
 )
+from src.instrumentation import tracing
 
 
 def main():
@@ -19,9 +23,24 @@ def main():
     file_path = "data/synthetic_prices_60min.csv"
     output_folder = "outputs/ml_forecast_optimization"
     train_ratio = 0.8  # 80% train, 20% test
+    workers = None  # None = all CPU cores
+    cache_path = ".cache/solves.sqlite"  # None disables the solve cache
+    dataset_cache_dir = ".cache/datasets"  # None disables the Dataset cache
+    feature_config = {"lag_hours": 24, "rolling_window": 24}
+    params_path = "outputs/tuning/best_params.json"  # written by run_tuning.py
+    strategy_plots = None  # "all", ("top", n) or ("worst", n) days
+
+    # Walk-forward backtest instead of a single train-test split
+    walk_forward = False
+    train_days = 90  # training window per fold
+    refit_every = 7  # days between refits
+    horizon = 7  # days forecast per fold
 
     os.makedirs(output_folder, exist_ok=True)
 
+    # Tuned LightGBM parameters, defaults when run_tuning.py has not run
+    params = load_params(params_path)
+
     # =========================
     # Step 1: Load & preprocess data (ML-specific)
     # =========================
@@ -33,12 +52,37 @@ def main():
     # Ensure correct temporal ordering
     data = data.sort_values("timestamp")
 
+    if walk_forward:
+        folds = walk_forward_backtest(
+            data,
+            train_days=train_days,
+            refit_every=refit_every,
+            horizon=horizon,
+            **feature_config,
+            params=params,
+            workers=workers,
+        )
+        folds.to_csv(
+            os.path.join(output_folder, "walk_forward_folds.csv"),
+            index=False,
+        )
+        print(folds.to_string(index=False))
+        print(
+            f"Mean RMSE: {folds['rmse'].mean():.3f} | "
+            f"Realized profit: {folds['realized_profit'].sum():.2f} | "
+            f"Perfect foresight: {folds['perfect_foresight_profit'].sum():.2f}"
+        )
+        return
+
     # =========================
     # Step 2: Feature engineering
     # =========================
-    data = create_lag_features(data, lag_hours=24)
-    data = create_rolling_features(data, rolling_window=24)
-    data.dropna(inplace=True)
+    features, valid = build_feature_matrix(
+        data["price"].to_numpy(),
+        **feature_config,
+    )
+    data = data[valid]
+    features = features[valid]
 
     # =========================
     # Step 3: Train-test split
@@ -47,24 +91,37 @@ def main():
     train_data = data.iloc[:split_idx]
     test_data = data.iloc[split_idx:]
 
-    X_train = train_data.drop(["date", "timestamp", "price"], axis=1)
+    X_train = features[:split_idx]
     y_train = train_data["price"]
 
-    X_test = test_data.drop(["date", "timestamp", "price"], axis=1)
+    X_test = features[split_idx:]
     y_test = test_data["price"]
 
     # =========================
     # Step 4: Train ML model
     # =========================
-    model = train_lightgbm_model(X_train, y_train, X_test, y_test)
+    dataset_path = None
+    if dataset_cache_dir:
+        dataset_path = dataset_cache_path(
+            feature_config,
+            X_train,
+            y_train,
+            params=params,
+            cache_dir=dataset_cache_dir,
+        )
+
+    model = train_lightgbm_model(
+        X_train, y_train, X_test, y_test,
+        params=params,
+        dataset_path=dataset_path,
+    )
 
-    test_data = test_data.copy()
-    test_data["predicted_price"] = model.predict(X_test)
+    test_data = test_data.assign(predicted_price=model.predict(X_test))
 
     # =========================
     # Step 5: MILP optimization using forecasts (1 MWh)
     # =========================
-    daily_results = []
+    forecast_days = {}
 
     for date, group in test_data.groupby("date"):
         prices = group["predicted_price"].values
@@ -73,9 +130,22 @@ def main():
         if len(prices) != 24:
             continue
 
-        result = optimize_battery_milp_1mwh(prices)
-        result["date"] = date
-        daily_results.append(result)
+        forecast_days[date] = prices
+
+    cache = SolveCache(cache_path) if cache_path else None
+    daily_results = [
+        result
+        for result in optimize_days(
+            forecast_days,
+            model="1mwh",
+            workers=workers,
+            cache=cache,
+        )
+        if "Error" not in result
+    ]
+
+    if cache is not None:
+        print(f"Solve cache: {cache.stats()}")
 
     results_df = pd.DataFrame(daily_results)
     results_df.to_csv(
@@ -93,6 +163,17 @@ def main():
         output_folder,
     )
 
+    if strategy_plots is not None:
+        index = plot_strategies(
+            daily_results,
+            forecast_days,
+            os.path.join(output_folder, "strategies"),
+            kind="forecast",
+            select=strategy_plots,
+            workers=workers,
+        )
+        print(f"Strategy charts: {index}")
+
     plot_daily_profits(results_df, output_folder)
 
     plot_strategy_forecast(
@@ -104,4 +185,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
\ No newline at end of file
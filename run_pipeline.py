@@ -0,0 +1,267 @@
+import os
+
+# Stages run in worker processes: never open interactive plot windows
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import pandas as pd  # noqa: E402
+
+from src.pipeline import Pipeline, Stage  # noqa: E402
+from src.instrumentation import tracing  # noqa: E402
+
+
+# =========================
+# Stage functions
+# =========================
+def ingest(inputs, file_path):
+    from src.preprocessing import load_and_preprocess_data
+
+    return load_and_preprocess_data(file_path)
+
+
+def eda(inputs, file_15min, file_60min, output_folder):
+    from src.preprocessing_eda import load_and_clean_data
+    from src.analysis import calculate_statistics, calculate_correlation
+    from src.visualization import plot_line_chart, plot_box_plot, plot_histogram
+
+    os.makedirs(output_folder, exist_ok=True)
+    data_15min = load_and_clean_data(file_15min)
+    data_60min = load_and_clean_data(file_60min)
+    price_15min = data_15min["price"]
+    price_60min = data_60min["price"]
+
+    stats_15 = calculate_statistics(price_15min)
+    stats_60 = calculate_statistics(price_60min)
+    pd.DataFrame({
+        "Statistic": stats_15.keys(),
+        "15-minute Prices": stats_15.values(),
+        "60-minute Prices": stats_60.values(),
+    }).to_csv(os.path.join(output_folder, "descriptive_statistics.csv"), index=False)
+
+    correlation = calculate_correlation(price_15min.resample("1h").mean(), price_60min)
+    with open(os.path.join(output_folder, "correlation.txt"), "w") as f:
+        f.write(
+            f"Correlation between 15-min (hourly aggregated) and 60-min prices: "
+            f"{correlation:.4f}"
+        )
+
+    plot_line_chart(price_15min, price_60min, data_15min, data_60min, output_folder)
+    plot_box_plot(price_15min, price_60min, output_folder)
+    plot_histogram(price_15min, price_60min, output_folder)
+    return {"correlation": correlation}
+
+
+def optimize_perfect_foresight(inputs, model, n_days, workers, cache_path):
+    from src.optimization import optimize_days
+    from src.optimization_cache import SolveCache
+
+    _, daily_prices = inputs["ingest"]
+    cache = SolveCache(cache_path) if cache_path else None
+    results = optimize_days(
+        dict(daily_prices.head(n_days).items()),
+        model=model,
+        workers=workers,
+        cache=cache,
+    )
+    return [
+        {"date": result["date"], "profit": result["Profit"], **result}
+        for result in results
+        if "Error" not in result
+    ]
+
+
+def report_perfect_foresight(inputs, model, output_folder, day_index_to_plot):
+    from src.visualization import (
+        plot_daily_profits,
+        plot_strategy_1mwh,
+        plot_strategy_2mwh_blocking,
+    )
+
+    results = inputs[f"optimize_{model}"]
+    _, daily_prices = inputs["ingest"]
+
+    os.makedirs(output_folder, exist_ok=True)
+    results_df = pd.DataFrame(results)
+    results_df.to_csv(os.path.join(output_folder, "results.csv"), index=False)
+
+    plot_daily_profits(results_df, output_folder)
+    plot_strategy = plot_strategy_1mwh if model == "1mwh" else plot_strategy_2mwh_blocking
+    if day_index_to_plot < len(results):
+        plot_strategy(day_index_to_plot, results, daily_prices, output_folder)
+
+
+def features(inputs, lag_hours, rolling_window):
+    from src.feature_engineering import build_feature_matrix
+
+    data, _ = inputs["ingest"]
+    data = data.rename(columns={"price_eur_mwh": "price"})[["date", "timestamp", "price"]]
+    data = data.sort_values("timestamp")
+
+    X, valid = build_feature_matrix(data["price"].to_numpy(), lag_hours, rolling_window)
+    return data[valid], X[valid]
+
+
+def train(inputs, train_ratio, params_path):
+    from src.modeling import load_params, train_lightgbm_model
+
+    data, X = inputs["features"]
+    split_idx = int(len(data) * train_ratio)
+    y = data["price"].to_numpy()
+
+    return train_lightgbm_model(
+        X[:split_idx], y[:split_idx],
+        X[split_idx:], y[split_idx:],
+        params=load_params(params_path),
+    )
+
+
+def predict(inputs, train_ratio):
+    data, X = inputs["features"]
+    split_idx = int(len(data) * train_ratio)
+    return data.iloc[split_idx:].assign(
+        predicted_price=inputs["train"].predict(X[split_idx:])
+    )
+
+
+def optimize_forecast(inputs, workers, cache_path):
+    from src.optimization import optimize_days
+    from src.optimization_cache import SolveCache
+
+    forecast_days = {
+        date: group["predicted_price"].values
+        for date, group in inputs["predict"].groupby("date")
+        if len(group) == 24
+    }
+    cache = SolveCache(cache_path) if cache_path else None
+    return [
+        {"date": result["date"], "profit": result["Profit"], **result}
+        for result in optimize_days(forecast_days, model="1mwh", workers=workers, cache=cache)
+        if "Error" not in result
+    ]
+
+
+def report_forecast(inputs, output_folder):
+    from src.visualization import (
+        plot_actual_vs_predicted,
+        plot_daily_profits,
+        plot_strategy_forecast,
+    )
+
+    test_data = inputs["predict"]
+    results = inputs["optimize_forecast"]
+
+    os.makedirs(output_folder, exist_ok=True)
+    results_df = pd.DataFrame(results)
+    results_df.to_csv(os.path.join(output_folder, "results.csv"), index=False)
+
+    plot_actual_vs_predicted(
+        test_data, test_data["price"], test_data["predicted_price"], output_folder
+    )
+    plot_daily_profits(results_df, output_folder)
+    plot_strategy_forecast(
+        day_index=0, results=results, test_data=test_data, output_folder=output_folder
+    )
+
+
+def build_pipeline():
+    # =========================
+    # Configuration
+    # =========================
+    file_15min = "data/synthetic_prices_15min.csv"
+    file_60min = "data/synthetic_prices_60min.csv"
+    n_days = 180
+    solve_workers = 1  # stages already run concurrently
+    cache_path = ".cache/solves.sqlite"  # None disables the solve cache
+    train_ratio = 0.8
+    params_path = "outputs/tuning/best_params.json"  # written by run_tuning.py
+
+    eda_folder = "outputs/price_data_exploration"
+    forecast_folder = "outputs/ml_forecast_optimization"
+
+    stages = [
+        Stage("ingest", ingest, config={"file_path": file_60min}, sources=[file_60min]),
+        Stage(
+            "eda",
+            eda,
+            config={
+                "file_15min": file_15min,
+                "file_60min": file_60min,
+                "output_folder": eda_folder,
+            },
+            sources=[file_15min, file_60min],
+            outputs=[os.path.join(eda_folder, "descriptive_statistics.csv")],
+        ),
+        Stage(
+            "features",
+            features,
+            deps=["ingest"],
+            config={"lag_hours": 24, "rolling_window": 24},
+        ),
+        Stage(
+            "train",
+            train,
+            deps=["features"],
+            config={"train_ratio": train_ratio, "params_path": params_path},
+            sources=[params_path] if os.path.exists(params_path) else [],
+        ),
+        Stage("predict", predict, deps=["train", "features"], config={"train_ratio": train_ratio}),
+        Stage(
+            "optimize_forecast",
+            optimize_forecast,
+            deps=["predict"],
+            config={"workers": solve_workers, "cache_path": cache_path},
+        ),
+        Stage(
+            "report_forecast",
+            report_forecast,
+            deps=["predict", "optimize_forecast"],
+            config={"output_folder": forecast_folder},
+            outputs=[os.path.join(forecast_folder, "results.csv")],
+        ),
+    ]
+
+    # Perfect-foresight MILP backtests, one branch per battery model
+    for model, folder, day_index in (
+        ("1mwh", "outputs/milp_1mwh", 150),
+        ("2mwh_blocking", "outputs/milp_2mwh_blocking", 50),
+    ):
+        stages += [
+            Stage(
+                f"optimize_{model}",
+                optimize_perfect_foresight,
+                deps=["ingest"],
+                config={
+                    "model": model,
+                    "n_days": n_days,
+                    "workers": solve_workers,
+                    "cache_path": cache_path,
+                },
+            ),
+            Stage(
+                f"report_{model}",
+                report_perfect_foresight,
+                deps=[f"optimize_{model}", "ingest"],
+                config={
+                    "model": model,
+                    "output_folder": folder,
+                    "day_index_to_plot": day_index,
+                },
+                outputs=[os.path.join(folder, "results.csv")],
+            ),
+        ]
+
+    return Pipeline(stages)
+
+
+def main():
+    targets = None  # e.g. ["report_forecast"]; None runs every stage
+    workers = None  # concurrent stages, None = all CPU cores
+    force = False  # True or a list of stage names to rerun
+
+    report = build_pipeline().run(targets=targets, workers=workers, force=force)
+    print(pd.DataFrame(report).to_string(index=False))
+
+
+if __name__ == "__main__":
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
@@ -4,6 +4,7 @@ import pandas as pd
 from src.preprocessing_eda import load_and_clean_data
 from src.analysis import calculate_statistics, calculate_correlation
 from src.visualization import plot_line_chart, plot_box_plot, plot_histogram
+from src.instrumentation import tracing
 
 
 def main():
@@ -77,4 +78,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+
+import lightgbm as lgb
+
+from src.preprocessing import load_price_matrix
+from src.day_ahead import day_ahead_features
+from src.modeling import train_lightgbm_model
+from src.service import ForecastService
+from src.instrumentation import tracing
+
+
+def main():
+    # =========================
+    # Configuration
+    # =========================
+    file_path = "data/synthetic_prices_60min.csv"
+    model_path = ".cache/models/day_ahead.txt"  # trained on first start
+    config_path = ".cache/models/day_ahead.json"  # feature settings of the model
+    host, port = "127.0.0.1", 8080
+    model = "1mwh"  # or "2mwh_blocking"
+    method = "dp"  # "dp", "highs" or "milp"
+    gate_closure_hour = 12
+    context_hours = 24
+    validation_ratio = 0.1
+
+    # =========================
+    # Step 1: Load or train the day-ahead model
+    # =========================
+    matrix, dates = load_price_matrix(file_path)
+    periods = matrix.shape[1]
+
+    # The cached model is only reused when it was trained with the same
+    # feature settings; otherwise its inputs would be shifted
+    config = {
+        "periods": periods,
+        "gate_closure_hour": gate_closure_hour,
+        "context_hours": context_hours,
+    }
+    saved_config = None
+    if os.path.exists(model_path) and os.path.exists(config_path):
+        with open(config_path) as f:
+            saved_config = json.load(f)
+
+    if saved_config == config:
+        booster = lgb.Booster(model_file=model_path)
+    else:
+        X, _ = day_ahead_features(
+            matrix,
+            dates,
+            gate_closure_hour=gate_closure_hour,
+            context_hours=context_hours,
+        )
+        y = matrix.ravel()
+        split_idx = int(len(dates) * (1 - validation_ratio)) * periods
+
+        booster = train_lightgbm_model(
+            X[:split_idx], y[:split_idx],
+            X[split_idx:], y[split_idx:],
+        )
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        booster.save_model(model_path)
+        with open(config_path, "w") as f:
+            json.dump(config, f, indent=2)
+
+    # =========================
+    # Step 2: Serve
+    # =========================
+    service = ForecastService(
+        booster,
+        periods=periods,
+        model=model,
+        method=method,
+        gate_closure_hour=gate_closure_hour,
+        context_hours=context_hours,
+    )
+    service.warm_up()
+
+    print(f"Serving on http://{host}:{port} (POST /forecast, GET /metrics)")
+    try:
+        asyncio.run(service.serve(host, port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+
+from src.preprocessing import load_price_matrix
+from src.optimization_sweep import SWEEP_PARAMETERS, run_sweep, save_cube, sweep_grid
+from src.instrumentation import tracing
+
+
+def main():
+    # =========================
+    # Configuration
+    # =========================
+    file_path = "data/synthetic_prices_60min.csv"
+    output_folder = "outputs/sweep"
+    cube_file = "cube.csv"  # "cube.parquet" requires pyarrow
+    workers = None  # None = all CPU cores
+
+    power_mw = [0.5, 1.0, 2.0]
+    energy_mwh = [1.0, 2.0, 4.0]
+    round_trip_efficiency = [0.85, 0.9, 1.0]
+    max_cycles = [1.0, 2.0, np.nan]  # per day, NaN = no limit
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    # =========================
+    # Step 1: Load prices as a (days x periods) matrix
+    # =========================
+    matrix, dates = load_price_matrix(file_path)
+
+    # =========================
+    # Step 2: Solve every grid point for every day
+    # =========================
+    grid = sweep_grid(power_mw, energy_mwh, round_trip_efficiency, max_cycles)
+    print(f"Sweeping {len(grid)} specs x {len(dates)} days")
+
+    cube = run_sweep(matrix, grid, dates=dates, workers=workers)
+
+    # =========================
+    # Step 3: Save the result cube and per-spec totals
+    # =========================
+    path = save_cube(cube, os.path.join(output_folder, cube_file))
+    print(f"Result cube: {path}")
+
+    summary = (
+        cube.groupby(["spec", *SWEEP_PARAMETERS], dropna=False)
+        .agg(profit=("profit", "sum"), mean_daily_cycles=("cycles", "mean"))
+        .reset_index()
+    )
+    summary.to_csv(os.path.join(output_folder, "summary.csv"), index=False)
+
+    print(summary.sort_values("profit", ascending=False).head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
@@ -0,0 +1,63 @@
+import os
+
+from src.preprocessing_ml import load_and_preprocess_data
+from src.feature_engineering import build_feature_matrix
+from src.tuning import save_best_params, tune_lightgbm
+from src.instrumentation import tracing
+
+
+def main():
+    # =========================
+    # Configuration
+    # =========================
+    file_path = "data/synthetic_prices_60min.csv"
+    output_folder = "outputs/tuning"
+    params_path = os.path.join(output_folder, "best_params.json")
+    train_ratio = 0.8  # tune on the training part only
+    feature_config = {"lag_hours": 24, "rolling_window": 24}
+    n_trials = 40
+    n_folds = 3
+    workers = None  # None = all CPU cores
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    # =========================
+    # Step 1: Load data and build features
+    # =========================
+    data = load_and_preprocess_data(file_path)
+    data = data.rename(columns={"price_eur_mwh": "price"})
+    data = data.sort_values("timestamp")
+
+    features, valid = build_feature_matrix(data["price"].to_numpy(), **feature_config)
+    data = data[valid]
+    features = features[valid]
+
+    split_idx = int(len(data) * train_ratio)
+
+    # =========================
+    # Step 2: Parallel search with pruning
+    # =========================
+    trials = tune_lightgbm(
+        features[:split_idx],
+        data["price"].to_numpy()[:split_idx],
+        feature_config,
+        n_trials=n_trials,
+        n_folds=n_folds,
+        workers=workers,
+    )
+
+    # =========================
+    # Step 3: Save trials and best parameters
+    # =========================
+    trials.to_csv(os.path.join(output_folder, "trials.csv"), index=False)
+    save_best_params(trials, params_path)
+
+    print(trials.head(10).to_string(index=False))
+    print(f"Pruned {(trials['state'] == 'pruned').sum()} of {len(trials)} trials")
+    print(f"Best parameters written to {params_path}")
+
+
+if __name__ == "__main__":
+    # BATTERY_TRACE=trace.json records a timing trace of the run
+    with tracing(os.environ.get("BATTERY_TRACE")):
+        main()
@@ -1,4 +1,7 @@
+import math
+
 import numpy as np
+import pandas as pd
 
 
 def calculate_statistics(data):
@@ -22,4 +25,211 @@ def calculate_correlation(series1, series2):
     """
     Calculate correlation between two price series.
     """
-    return series1.corr(series2)
\ No newline at end of file
+    return series1.corr(series2)
+
+
+# ======================================================
+# STREAMING STATISTICS
+# ======================================================
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees.
+
+    Values are counted in logarithmically sized buckets (as in DDSketch),
+    so any quantile is returned within relative_accuracy of a true sample
+    value. Negative prices get their own buckets and values closer to zero
+    than min_value are counted as zero. Memory grows with the number of
+    occupied buckets, not with the number of values.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _add_to(self, store, magnitudes):
+        buckets = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        keys, counts = np.unique(buckets, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values):
+        """
+        Add an array of values (NaNs are ignored).
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+
+        small = np.abs(values) < self.min_value
+        self._add_to(self.positive, values[(values > 0) & ~small])
+        self._add_to(self.negative, -values[(values < 0) & ~small])
+        self.zero_count += int(small.sum())
+        self.count += len(values)
+
+    def merge(self, other):
+        """
+        Add the counts of another sketch with the same accuracy.
+        """
+        if other.gamma != self.gamma or other.min_value != self.min_value:
+            raise ValueError("Cannot merge sketches with different accuracy settings")
+
+        for store, other_store in (
+            (self.positive, other.positive),
+            (self.negative, other.negative),
+        ):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        """
+        Approximate q-quantile (0 <= q <= 1), or NaN for an empty sketch.
+        """
+        if self.count == 0:
+            return np.nan
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        # Most negative values come first
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+
+        return self._bucket_value(max(self.positive))
+
+
+class StreamingStatistics:
+    """
+    Single-pass, mergeable version of calculate_statistics.
+
+    Mean and variance use Welford's algorithm, combined chunk by chunk
+    with Chan's parallel update, so results do not depend on how the data
+    is split. Percentiles come from a QuantileSketch. Accumulators built on
+    separate files or processes can be combined with merge().
+
+    Example:
+        stats = StreamingStatistics()
+        for chunk in chunks:
+            stats.update(chunk)
+        stats.result()
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def update(self, values):
+        """
+        Add a chunk of values (NaNs are ignored, like pandas does).
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        mean = values.mean()
+        self._combine(
+            len(values),
+            mean,
+            float(((values - mean) ** 2).sum()),
+            values.min(),
+            values.max(),
+        )
+        self.sketch.update(values)
+        return self
+
+    def merge(self, other):
+        """
+        Combine with an accumulator built on other data.
+        """
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def result(self):
+        """
+        Statistics with the same keys as calculate_statistics. Std Dev and
+        Variance use the sample (n - 1) definition, like pandas.
+        """
+        variance = self.m2 / (self.count - 1) if self.count > 1 else np.nan
+        median = self.sketch.quantile(0.5)
+        return {
+            "Mean": self.mean if self.count else np.nan,
+            "Median": median,
+            "Std Dev": math.sqrt(variance) if self.count > 1 else np.nan,
+            "Min": self.min if self.count else np.nan,
+            "Max": self.max if self.count else np.nan,
+            "25th Percentile": self.sketch.quantile(0.25),
+            "50th Percentile": median,
+            "75th Percentile": self.sketch.quantile(0.75),
+            "Variance": variance,
+        }
+
+
+def streaming_statistics(
+    file_paths,
+    column="price_eur_mwh",
+    chunksize=1_000_000,
+    relative_accuracy=0.01,
+):
+    """
+    Compute descriptive statistics over one or more CSV files without
+    loading them into memory.
+
+    Args:
+        file_paths (str or list): CSV file(s) to scan.
+        column (str): Price column to summarize.
+        chunksize (int): Rows read per chunk.
+        relative_accuracy (float): Relative accuracy of the percentiles.
+
+    Returns:
+        StreamingStatistics: Accumulator; call .result() for the statistics
+            or .merge() it with accumulators of other files.
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+
+    stats = StreamingStatistics(relative_accuracy)
+    for file_path in file_paths:
+        for chunk in pd.read_csv(file_path, usecols=[column], chunksize=chunksize):
+            stats.update(pd.to_numeric(chunk[column], errors="coerce").to_numpy())
+    return stats
@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering import build_feature_matrix
+from src.modeling import train_lightgbm_model
+from src.optimization_dp import BATCH_DISPATCH
+
+
+def walk_forward_folds(dates, train_days, refit_every, horizon):
+    """
+    Split a sorted list of dates into walk-forward folds.
+
+    Fold k trains on the train_days days before its start date and
+    forecasts the following horizon days; consecutive folds start
+    refit_every days apart.
+
+    Returns:
+        list: (train_dates, test_dates) pairs.
+    """
+    folds = []
+    start = train_days
+    while start < len(dates):
+        folds.append((
+            dates[start - train_days:start],
+            dates[start:start + horizon],
+        ))
+        start += refit_every
+    return folds
+
+
+def realized_profit(forecast, actual, model="1mwh"):
+    """
+    Profit of dispatching on forecast prices but settling at actual prices.
+
+    Args:
+        forecast (np.ndarray): (days x periods) forecast prices.
+        actual (np.ndarray): (days x periods) actual prices.
+        model (str): "1mwh" or "2mwh_blocking".
+
+    Returns:
+        np.ndarray: Realized profit per day.
+    """
+    solve, net_discharge = BATCH_DISPATCH[model]
+    schedule = net_discharge(solve(forecast))
+    return (schedule * actual).sum(axis=1)
+
+
+def _run_fold(task):
+    """
+    Train, forecast and dispatch one fold inside a worker process.
+    """
+    (fold, train_dates, X_train, y_train, X_test, y_test, test_days,
+     validation_fraction, params, model, periods) = task
+
+    # Early stopping on the tail of the training window, not on the test days
+    n_val = max(1, int(len(y_train) * validation_fraction))
+    booster = train_lightgbm_model(
+        X_train[:-n_val], y_train[:-n_val],
+        X_train[-n_val:], y_train[-n_val:],
+        params=params,
+        log_period=0,
+    )
+    predicted = booster.predict(X_test)
+    error = predicted - y_test
+
+    # Dispatch complete forecast days only
+    day_values, day_index, counts = np.unique(
+        test_days, return_inverse=True, return_counts=True
+    )
+    complete = np.isin(day_index, np.flatnonzero(counts == periods))
+    forecast = predicted[complete].reshape(-1, periods)
+    actual = y_test[complete].reshape(-1, periods)
+
+    profit = realized_profit(forecast, actual, model).sum() if len(actual) else np.nan
+    perfect = realized_profit(actual, actual, model).sum() if len(actual) else np.nan
+
+    return {
+        "fold": fold,
+        "train_start": train_dates[0],
+        "train_end": train_dates[-1],
+        "test_start": day_values[0],
+        "test_end": day_values[-1],
+        "train_rows": len(y_train),
+        "test_rows": len(y_test),
+        "dispatch_days": len(actual),
+        "best_iteration": booster.best_iteration,
+        "rmse": float(np.sqrt(np.mean(error ** 2))),
+        "mae": float(np.mean(np.abs(error))),
+        "realized_profit": profit,
+        "perfect_foresight_profit": perfect,
+    }
+
+
+def walk_forward_backtest(
+    data,
+    train_days=90,
+    refit_every=7,
+    horizon=7,
+    lag_hours=24,
+    rolling_window=24,
+    validation_fraction=0.1,
+    model="1mwh",
+    params=None,
+    workers=None,
+):
+    """
+    Walk-forward backtest of the LightGBM forecaster and battery dispatch.
+
+    Every fold refits the model on a rolling train window, forecasts the
+    next horizon days, dispatches the battery on the forecast (exact DP) and
+    settles the schedule at actual prices. Folds are independent and train
+    in parallel worker processes; LightGBM threads are capped so that
+    workers x threads does not exceed the CPU count.
+
+    Args:
+        data (pd.DataFrame): Output of preprocessing_ml.load_and_preprocess_data.
+        train_days (int): Days in each training window.
+        refit_every (int): Days between refits (fold start dates).
+        horizon (int): Days forecast by each fold.
+        lag_hours (int): Number of lag features.
+        rolling_window (int): Window of the rolling features.
+        validation_fraction (float): Tail of each train window used for
+            early stopping.
+        model (str): Battery model, "1mwh" or "2mwh_blocking".
+        params (dict): Extra LightGBM parameters.
+        workers (int): Worker processes, default the CPU count.
+
+    Returns:
+        pd.DataFrame: One row per fold with forecast error and profits.
+
+    Raises:
+        ValueError: If the data is too short for a single fold.
+    """
+    data = data.sort_values("timestamp")
+    features, valid = build_feature_matrix(
+        data["price"].to_numpy(), lag_hours, rolling_window
+    )
+    features = features[valid]
+    prices = data["price"].to_numpy()[valid]
+    days = data["date"].to_numpy()[valid]
+
+    periods = int(pd.Series(days).value_counts().max())
+    dates = np.unique(days)
+    folds = walk_forward_folds(dates, train_days, refit_every, horizon)
+    if not folds:
+        raise ValueError(
+            f"No walk-forward folds: {len(dates)} days with complete features, "
+            f"but train_days={train_days} needs at least {train_days + 1}"
+        )
+
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(workers or cpu_count, len(folds)))
+    params = {"num_threads": max(1, cpu_count // workers), **(params or {})}
+
+    tasks = []
+    for fold, (train_dates, test_dates) in enumerate(folds):
+        train_rows = np.isin(days, train_dates)
+        test_rows = np.isin(days, test_dates)
+        tasks.append((
+            fold,
+            (train_dates[0], train_dates[-1]),
+            features[train_rows], prices[train_rows],
+            features[test_rows], prices[test_rows],
+            days[test_rows],
+            validation_fraction, params, model, periods,
+        ))
+
+    if workers == 1:
+        rows = [_run_fold(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rows = list(executor.map(_run_fold, tasks))
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,272 @@
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def time_call(func, repeat=5, setup=None):
+    """
+    Time a function call repeatedly.
+
+    Args:
+        func (callable): Function without arguments.
+        repeat (int): Number of timed calls.
+        setup (callable): Run before every call, not timed.
+
+    Returns:
+        dict: min, median, mean and stdev in seconds, and repeat.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "repeat": repeat,
+    }
+
+
+def _environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    import lightgbm
+    import pulp
+    import scipy
+
+    return {
+        "commit": commit,
+        "timestamp": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+        "lightgbm": lightgbm.__version__,
+        "pulp": pulp.__version__,
+    }
+
+
+# ======================================================
+# BENCHMARK GROUPS
+# ======================================================
+def _bench_loaders(files, repeat):
+    from src.preprocessing import load_and_preprocess_data, load_price_matrix
+    from src.preprocessing_eda import load_and_clean_data
+    from src.preprocessing_ml import load_and_preprocess_data as load_ml
+
+    loaders = {
+        "preprocessing.load_and_preprocess_data": load_and_preprocess_data,
+        "preprocessing.load_price_matrix": load_price_matrix,
+        "preprocessing_eda.load_and_clean_data": load_and_clean_data,
+        "preprocessing_ml.load_and_preprocess_data": load_ml,
+    }
+
+    # Loaders read through the ingestion cache in the working directory
+    def clear_cache():
+        shutil.rmtree(os.path.join(".cache", "prices"), ignore_errors=True)
+
+    results = {}
+    for resolution, path in files.items():
+        for name, loader in loaders.items():
+            results[f"load/{name}/{resolution}/cold"] = time_call(
+                lambda: loader(path), repeat, setup=clear_cache
+            )
+            loader(path)
+            results[f"load/{name}/{resolution}/warm"] = time_call(
+                lambda: loader(path), repeat
+            )
+    return results
+
+
+def _bench_optimization(daily_prices, repeat, workers):
+    from src.optimization import BatteryModel, MODELS, optimize_days, _TEMPLATES
+    from src.optimization_dp import solve_dp_batch_1mwh, solve_dp_batch_2mwh_blocking
+
+    batch_solvers = {
+        "1mwh": solve_dp_batch_1mwh,
+        "2mwh_blocking": solve_dp_batch_2mwh_blocking,
+    }
+    days = dict(daily_prices.items())
+    first = next(iter(days.values()))
+    hours = list(range(1, len(first) + 1))
+    matrix = np.vstack(list(days.values()))
+
+    results = {}
+    for model in MODELS:
+        # Per-day latency: model construction vs. solve
+        results[f"optimize/{model}/build"] = time_call(
+            lambda: _TEMPLATES[model][0](hours), repeat
+        )
+        template = BatteryModel.build({"model": model, "periods": len(first)})
+        results[f"optimize/{model}/solve_template"] = time_call(
+            lambda: template.solve(first), repeat
+        )
+        for method in ("milp", "highs", "dp"):
+            results[f"optimize/{model}/solve_{method}"] = time_call(
+                lambda: MODELS[model](first, method=method), repeat
+            )
+
+        # Batch throughput
+        for method in ("milp", "dp"):
+            stats = time_call(
+                lambda: list(optimize_days(days, model=model, workers=workers, method=method)),
+                max(1, repeat // 2),
+            )
+            stats["days_per_second"] = len(days) / stats["median"]
+            results[f"optimize/{model}/batch_{method}"] = stats
+
+        stats = time_call(lambda: batch_solvers[model](matrix), repeat)
+        stats["days_per_second"] = len(matrix) / stats["median"]
+        results[f"optimize/{model}/batch_dp_vectorized"] = stats
+
+    return results
+
+
+def _bench_ml(prices, repeat):
+    from src.feature_engineering import build_feature_matrix
+    from src.modeling import train_lightgbm_model
+
+    results = {
+        "features/build_feature_matrix": time_call(
+            lambda: build_feature_matrix(prices, 24, 24), repeat
+        ),
+    }
+
+    X, valid = build_feature_matrix(prices, 24, 24)
+    X, y = X[valid], prices[valid]
+    split_idx = int(len(y) * 0.8)
+
+    def train():
+        return train_lightgbm_model(
+            X[:split_idx], y[:split_idx], X[split_idx:], y[split_idx:], log_period=0
+        )
+
+    results["lightgbm/train"] = time_call(train, max(1, repeat // 2))
+
+    booster = train()
+    stats = time_call(lambda: booster.predict(X[split_idx:]), repeat)
+    stats["rows_per_second"] = (len(y) - split_idx) / stats["median"]
+    results["lightgbm/predict"] = stats
+    return results
+
+
+def run_benchmarks(days=182, repeat=5, workers=None, seed=42, groups=None):
+    """
+    Run the benchmark suite on freshly generated synthetic data.
+
+    Data of the requested size is generated with
+    generate_synthetic_energy_prices into a temporary directory, which is
+    also the working directory while benchmarking, so the ingestion cache
+    of the project is left alone.
+
+    Args:
+        days (int): Days of synthetic data.
+        repeat (int): Timed calls per benchmark (halved for slow ones).
+        workers (int): Worker processes of the batch optimizations.
+        seed (int): Seed of the synthetic data.
+        groups (list): Subset of "loaders", "optimization", "ml".
+
+    Returns:
+        dict: {"environment": ..., "config": ..., "benchmarks": {name: stats}}
+    """
+    from generate_synthetic_data import generate_synthetic_energy_prices
+    from src.preprocessing import load_and_preprocess_data
+
+    groups = groups or ["loaders", "optimization", "ml"]
+    environment = _environment()
+    cwd = os.getcwd()
+
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_synthetic_energy_prices(days=days, output_dir=tmp, seed=seed)
+            files = {
+                "15min": os.path.join(tmp, "synthetic_prices_15min.csv"),
+                "60min": os.path.join(tmp, "synthetic_prices_60min.csv"),
+            }
+            data, daily_prices = load_and_preprocess_data(files["60min"])
+
+            if "loaders" in groups:
+                benchmarks.update(_bench_loaders(files, repeat))
+            if "optimization" in groups:
+                benchmarks.update(_bench_optimization(daily_prices, repeat, workers))
+            if "ml" in groups:
+                benchmarks.update(_bench_ml(data["price_eur_mwh"].to_numpy(), repeat))
+        finally:
+            os.chdir(cwd)
+
+    return {
+        "environment": environment,
+        "config": {"days": days, "repeat": repeat, "workers": workers, "seed": seed},
+        "benchmarks": benchmarks,
+    }
+
+
+def save_results(results, output_folder):
+    """
+    Write benchmark results as JSON, named by commit and time.
+
+    Returns:
+        str: Path of the JSON file.
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    environment = results["environment"]
+    stamp = pd.Timestamp(environment["timestamp"]).strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(
+        output_folder, f"benchmark_{environment['commit'] or 'nocommit'}_{stamp}.json"
+    )
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    return path
+
+
+def compare_results(baseline, current):
+    """
+    Compare two benchmark result dicts (or JSON paths) by median time.
+
+    Returns:
+        pd.DataFrame: Median seconds of both runs and their ratio
+            (current / baseline; above 1 is slower).
+    """
+    if isinstance(baseline, str):
+        with open(baseline) as f:
+            baseline = json.load(f)
+    if isinstance(current, str):
+        with open(current) as f:
+            current = json.load(f)
+
+    rows = []
+    for name, stats in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        rows.append({
+            "benchmark": name,
+            "baseline_s": before["median"] if before else np.nan,
+            "current_s": stats["median"],
+            "ratio": stats["median"] / before["median"] if before else np.nan,
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+
+
+def day_ahead_feature_names(context_periods):
+    """
+    Column names of the day-ahead feature matrix.
+    """
+    return [
+        "horizon",
+        "day_of_week",
+        "same_slot_2d",
+        "same_slot_7d",
+        "context_mean",
+        "context_std",
+    ] + [f"known_lag_{k}" for k in range(context_periods, 0, -1)]
+
+
+def _gather(flat, base, periods, gate, context, day_of_week):
+    """
+    Gather the day-ahead features of several target days from a flat price
+    array; base holds the flat index at which each target day starts.
+    """
+    slots = np.arange(periods)
+    same_slot_2d = flat[base[:, None] - 2 * periods + slots]
+    same_slot_7d = flat[base[:, None] - 7 * periods + slots]
+    known = flat[base[:, None] - periods + gate - context + np.arange(context)]
+
+    X = np.empty((len(base), periods, 6 + context))
+    X[:, :, 0] = slots
+    X[:, :, 1] = day_of_week[:, None]
+    X[:, :, 2] = same_slot_2d
+    X[:, :, 3] = same_slot_7d
+    X[:, :, 4] = known.mean(axis=1)[:, None]
+    X[:, :, 5] = known.std(axis=1)[:, None]
+    X[:, :, 6:] = known[:, None, :]
+    return X.reshape(-1, 6 + context)
+
+
+def _calendar(matrix, dates, target_dates):
+    """
+    Place the rows of a (days x periods) matrix on a gap-free daily calendar
+    that also covers the target dates; missing days are NaN.
+
+    Returns:
+        np.ndarray: Calendar matrix.
+        np.ndarray: Calendar position of each target date.
+        pd.DatetimeIndex: Target dates.
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    targets = pd.DatetimeIndex(pd.to_datetime(target_dates))
+
+    start = min(dates.min(), targets.min())
+    end = max(dates.max(), targets.max())
+    day = pd.Timedelta(days=1)
+
+    calendar = np.full(((end - start) // day + 1, matrix.shape[1]), np.nan)
+    calendar[(dates - start) // day] = matrix
+    return calendar, np.asarray((targets - start) // day), targets
+
+
+def day_ahead_features(
+    matrix,
+    dates,
+    target_dates=None,
+    gate_closure_hour=12,
+    context_hours=24,
+):
+    """
+    Features for forecasting whole days at day-ahead gate closure.
+
+    A bid for day d is submitted at gate_closure_hour on day d - 1, so only
+    prices up to that moment may be used. Every (day, horizon) pair is one
+    row of a single horizon-indexed model:
+
+        - horizon, day_of_week: slot of the day and weekday of day d
+        - same_slot_2d, same_slot_7d: price of the same slot on d - 2, d - 7
+        - context_mean, context_std, known_lag_*: the last context_hours of
+          prices before gate closure (identical for all horizons of a day)
+
+    Everything is gathered with index arithmetic on a flat calendar, so the
+    matrix for a year of days is built without a Python loop. Missing
+    history shows up as NaN, which LightGBM treats as missing.
+
+    Args:
+        matrix (np.ndarray): (days x periods) prices from load_price_matrix.
+        dates (pd.Index): Date of each matrix row.
+        target_dates (array-like): Days to build features for, default the
+            matrix days. May include days after the last row (tomorrow).
+        gate_closure_hour (float): Gate closure on the previous day.
+        context_hours (float): Hours of price history before gate closure.
+
+    Returns:
+        np.ndarray: (len(target_dates) * periods x features) matrix, rows
+            ordered day by day, so predictions reshape to (days x periods).
+        list: Feature names.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    periods = matrix.shape[1]
+    if target_dates is None:
+        target_dates = dates
+
+    gate = int(round(gate_closure_hour * periods / 24))
+    context = int(round(context_hours * periods / 24))
+
+    calendar, positions, targets = _calendar(matrix, dates, target_dates)
+
+    # Pad with NaN days in front so all look-backs index into the array
+    pad_days = 7 + -(-context // periods)
+    flat = np.concatenate([np.full(pad_days * periods, np.nan), calendar.ravel()])
+    base = (positions + pad_days) * periods
+
+    X = _gather(flat, base, periods, gate, context, targets.dayofweek.to_numpy())
+    return X, day_ahead_feature_names(context)
+
+
+def history_features(
+    history,
+    target_date,
+    periods=24,
+    gate_closure_hour=12,
+    context_hours=24,
+):
+    """
+    Day-ahead features of one target day from a raw price history.
+
+    Live counterpart of day_ahead_features: history is the price series up
+    to gate closure on the day before target_date (its last value is the
+    last slot before the gate). Missing history is treated as NaN.
+
+    Args:
+        history (array-like): Recent prices, oldest first.
+        target_date (date): Day to forecast.
+        periods (int): Periods per day.
+        gate_closure_hour (float): Gate closure on the previous day.
+        context_hours (float): Hours of price history before gate closure.
+
+    Returns:
+        np.ndarray: (periods x features) matrix.
+    """
+    gate = int(round(gate_closure_hour * periods / 24))
+    context = int(round(context_hours * periods / 24))
+
+    pad = 7 * periods + context
+    flat = np.concatenate([np.full(pad, np.nan), np.asarray(history, dtype=np.float64)])
+    base = np.array([len(flat) - gate + periods])
+
+    day_of_week = np.array([pd.Timestamp(target_date).dayofweek])
+    return _gather(flat, base, periods, gate, context, day_of_week)
+
+
+def predict_day_ahead(model, X, periods):
+    """
+    Forecast all periods of all days with one batched predict call.
+
+    Args:
+        model (lgb.Booster): Model trained on day_ahead_features rows.
+        X (np.ndarray): Output of day_ahead_features.
+        periods (int): Periods per day.
+
+    Returns:
+        np.ndarray: (days x periods) forecast prices.
+    """
+    return model.predict(X).reshape(-1, periods)
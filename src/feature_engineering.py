@@ -1,3 +1,9 @@
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import traced
+
+
 def create_lag_features(df, lag_hours):
     """
     Create lagged price features for the dataset.
@@ -31,4 +37,199 @@ def create_rolling_features(df, rolling_window):
     df[f"rolling_std_{rolling_window}"] = (
         df["price"].rolling(rolling_window).std()
     )
-    return df
\ No newline at end of file
+    return df
+
+
+def feature_names(lag_hours, rolling_window):
+    """
+    Column names of build_feature_matrix, matching the DataFrame builders.
+    """
+    return [f"lag_{lag}_hour" for lag in range(1, lag_hours + 1)] + [
+        f"rolling_mean_{rolling_window}",
+        f"rolling_std_{rolling_window}",
+    ]
+
+
+@traced("features.build_feature_matrix")
+def build_feature_matrix(prices, lag_hours, rolling_window, dtype=np.float64):
+    """
+    Build the lag and rolling features as one NumPy matrix.
+
+    Produces the same columns as create_lag_features followed by
+    create_rolling_features (see feature_names), but writes them into a
+    single preallocated array: the lags are copied from a strided
+    sliding-window view of the prices and the rolling mean/std are written
+    straight into their columns, so there are no per-column DataFrame
+    inserts, block copies or intermediate frames.
+
+    Args:
+        prices (np.ndarray): Price series in time order.
+        lag_hours (int): Number of lagged hours to create.
+        rolling_window (int): Window size for rolling calculations.
+        dtype: Output dtype, e.g. np.float32 to halve memory.
+
+    Returns:
+        np.ndarray: Feature matrix (rows x (lag_hours + 2)), NaN where a
+            feature is undefined.
+        np.ndarray: Boolean mask of rows where every feature is defined.
+    """
+    p = np.asarray(prices, dtype=np.float64)
+    n = len(p)
+    X = np.full((n, lag_hours + 2), np.nan, dtype=dtype)
+
+    # Lags: row t of the window view holds p[t - lag_hours], ..., p[t]
+    if 0 < lag_hours < n:
+        windows = np.lib.stride_tricks.sliding_window_view(p, lag_hours + 1)
+        X[lag_hours:, :lag_hours] = windows[:, lag_hours - 1::-1]
+
+    # The first rows only have the lags that reach back to the series start
+    for t in range(1, min(lag_hours, n)):
+        X[t, :t] = p[t - 1::-1]
+
+    # Rolling mean/std over the current and previous prices. pandas' rolling
+    # kernels run on the 1-D series only, which keeps the values bit-identical
+    # to create_rolling_features without building a DataFrame.
+    rolling = pd.Series(p, copy=False).rolling(rolling_window)
+    X[:, lag_hours] = rolling.mean().to_numpy()
+    X[:, lag_hours + 1] = rolling.std().to_numpy()
+
+    # Rows where no lag or rolling window touches a missing price
+    missing_before = np.concatenate(([0], np.cumsum(np.isnan(p))))
+    rows = np.arange(n)
+    valid = (rows >= lag_hours) & (rows >= rolling_window - 1) & (rolling_window > 1)
+    lag_start = np.maximum(rows - lag_hours, 0)
+    window_start = np.maximum(rows + 1 - rolling_window, 0)
+    valid &= missing_before[rows] == missing_before[lag_start]
+    valid &= missing_before[rows + 1] == missing_before[window_start]
+    return X, valid
+
+
+class OnlineFeatureState:
+    """
+    Incremental lag/rolling feature builder for live forecasting.
+
+    Keeps the most recent prices in a fixed-size ring buffer together with
+    running sums for the rolling mean and standard deviation, so each new
+    price costs O(1) work in the length of the history. The emitted vector
+    matches the newest row of build_feature_matrix (same column order, see
+    feature_names), with NaN for features that are not yet defined.
+
+    Example:
+        state = OnlineFeatureState(lag_hours=24, rolling_window=24)
+        for price in stream:
+            features = state.update(price)
+            if state.is_ready:
+                model.predict(features[None, :])
+    """
+
+    def __init__(self, lag_hours, rolling_window):
+        self.lag_hours = lag_hours
+        self.rolling_window = rolling_window
+        self.capacity = max(lag_hours + 1, rolling_window)
+
+        self._buffer = np.full(self.capacity, np.nan)
+        self._position = -1  # slot of the newest price
+        self._count = 0
+
+        # Running sums over the rolling window, relative to a reference
+        # price to limit cancellation; refreshed from the buffer regularly
+        self._reference = None
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._missing = 0
+        self._since_refresh = 0
+
+        self._last_features = np.full(lag_hours + 2, np.nan)
+
+    @property
+    def is_ready(self):
+        """
+        True once every feature of the newest row is defined.
+        """
+        return (
+            self._count > self.lag_hours
+            and self._count >= self.rolling_window
+            and not np.isnan(self._last_features).any()
+        )
+
+    def _window(self):
+        """
+        Prices of the current rolling window (oldest first).
+        """
+        idx = (self._position - np.arange(self.rolling_window - 1, -1, -1)) % self.capacity
+        return self._buffer[idx]
+
+    def _refresh(self):
+        window = self._window()
+        missing = np.isnan(window)
+        shifted = np.where(missing, 0.0, window - self._reference)
+        self._sum = float(shifted.sum())
+        self._sum_sq = float((shifted ** 2).sum())
+        self._missing = int(missing.sum())
+        self._since_refresh = 0
+
+    def _add_to_window(self, price, sign):
+        if np.isnan(price):
+            self._missing += sign
+        else:
+            shifted = price - self._reference
+            self._sum += sign * shifted
+            self._sum_sq += sign * shifted * shifted
+
+    def update(self, price):
+        """
+        Add the newest price and return its feature vector.
+
+        Args:
+            price (float): Newest price.
+
+        Returns:
+            np.ndarray: Features of the newest row (lag_hours + 2 values).
+        """
+        price = float(price)
+        if self._reference is None and not np.isnan(price):
+            self._reference = price
+
+        # The price leaving the rolling window, if the window is full
+        leaving = None
+        if self._count >= self.rolling_window:
+            leaving = self._buffer[
+                (self._position - self.rolling_window + 1) % self.capacity
+            ]
+
+        self._position = (self._position + 1) % self.capacity
+        self._buffer[self._position] = price
+        self._count += 1
+
+        if self._reference is not None:
+            if self._since_refresh >= self.capacity:
+                self._refresh()
+            else:
+                if leaving is not None:
+                    self._add_to_window(leaving, -1)
+                self._add_to_window(price, +1)
+                self._since_refresh += 1
+        elif np.isnan(price):
+            self._missing += 1
+            if leaving is not None:
+                self._missing -= 1
+
+        features = np.full(self.lag_hours + 2, np.nan)
+
+        # Lags: the prices before the newest one
+        available = min(self.lag_hours, self._count - 1)
+        if available > 0:
+            idx = (self._position - np.arange(1, available + 1)) % self.capacity
+            features[:available] = self._buffer[idx]
+
+        # Rolling statistics over the newest rolling_window prices
+        w = self.rolling_window
+        if self._count >= w and self._missing == 0:
+            mean = self._sum / w
+            features[self.lag_hours] = mean + self._reference
+            if w > 1:
+                variance = (self._sum_sq - self._sum * mean) / (w - 1)
+                features[self.lag_hours + 1] = np.sqrt(max(variance, 0.0))
+
+        self._last_features = features
+        return features
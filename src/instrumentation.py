@@ -0,0 +1,298 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Instrumentation is off unless enabled; a disabled span is one flag check
+_enabled = False
+_events = []
+
+
+class _Span:
+    """
+    Timed region recorded as a Chrome trace "complete" event.
+
+    Wall time is measured with perf_counter (comparable across processes)
+    and CPU time with thread_time, i.e. the CPU of the calling thread only;
+    time spent in solver subprocesses shows up as wall time.
+    """
+
+    __slots__ = ("name", "args", "_wall", "_cpu")
+    active = True
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def set(self, **args):
+        """
+        Attach attributes (e.g. solver status) to the span.
+        """
+        self.args.update(args)
+
+    def __enter__(self):
+        self._cpu = time.thread_time_ns()
+        self._wall = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter_ns() - self._wall
+        cpu = time.thread_time_ns() - self._cpu
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _events.append({
+            "name": self.name,
+            "cat": self.name.split(".")[0],
+            "ph": "X",
+            "ts": self._wall / 1e3,
+            "dur": wall / 1e3,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {**self.args, "cpu_ms": cpu / 1e6},
+        })
+        return False
+
+
+class _NullSpan:
+    """
+    Shared do-nothing span returned while instrumentation is disabled.
+    """
+
+    __slots__ = ()
+    active = False
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **args):
+    """
+    Time a block of code.
+
+    Example:
+        with span("optimize.solve", day=date) as s:
+            problem.solve(solver)
+            s.set(status=pulp.LpStatus[problem.status])
+
+    Args:
+        name (str): Stage name, "<category>.<stage>".
+        **args: Attributes stored with the event (e.g. the day).
+
+    Returns:
+        Context manager; a shared no-op span when disabled. Its "active"
+        attribute tells whether the span is recorded, so expensive
+        attributes can be skipped.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name):
+    """
+    Decorator recording every call of a function as a span.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """
+    Discard all recorded events.
+    """
+    _events.clear()
+
+
+def events():
+    """
+    Copy of the events recorded in this process.
+    """
+    return list(_events)
+
+
+# ======================================================
+# WORKER PROCESSES
+# ======================================================
+def start_worker():
+    """
+    Enable recording in a worker process (pool initializer).
+
+    Forked workers inherit the events of the parent; they are dropped so
+    that only the worker's own spans are sent back with drain().
+    """
+    reset()
+    enable()
+
+
+def drain():
+    """
+    Return and clear the events recorded so far.
+    """
+    drained = list(_events)
+    _events.clear()
+    return drained
+
+
+def record(worker_events):
+    """
+    Add events drained in a worker process to this process.
+    """
+    _events.extend(worker_events)
+
+
+# ======================================================
+# OUTPUT
+# ======================================================
+def write_trace(path):
+    """
+    Write the recorded events as a Chrome trace (chrome://tracing,
+    Perfetto or speedscope).
+
+    Returns:
+        str: Path of the JSON file.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f, default=str)
+    return path
+
+
+def summary(recorded=None):
+    """
+    Per-stage totals of the recorded spans.
+
+    Nested spans are counted in every enclosing stage, so the wall totals
+    of different stages overlap.
+
+    Args:
+        recorded (list): Events, default the events of this process.
+
+    Returns:
+        pd.DataFrame: One row per stage with calls, total and mean wall
+            time, 95th percentile wall time and total CPU time, sorted by
+            total wall time.
+    """
+    recorded = _events if recorded is None else recorded
+    columns = ["stage", "calls", "wall_s", "wall_mean_ms", "wall_p95_ms", "cpu_s"]
+    if not recorded:
+        return pd.DataFrame(columns=columns)
+
+    frame = pd.DataFrame({
+        "stage": [event["name"] for event in recorded],
+        "wall_ms": [event["dur"] / 1e3 for event in recorded],
+        "cpu_ms": [event["args"]["cpu_ms"] for event in recorded],
+    })
+    rows = []
+    for stage, group in frame.groupby("stage", sort=False):
+        wall = group["wall_ms"].to_numpy()
+        rows.append({
+            "stage": stage,
+            "calls": len(wall),
+            "wall_s": wall.sum() / 1e3,
+            "wall_mean_ms": wall.mean(),
+            "wall_p95_ms": np.percentile(wall, 95),
+            "cpu_s": group["cpu_ms"].sum() / 1e3,
+        })
+    return pd.DataFrame(rows, columns=columns).sort_values(
+        "wall_s", ascending=False, ignore_index=True
+    )
+
+
+def day_summary(recorded=None):
+    """
+    Wall time per day and stage.
+
+    Spans recorded with a "day" attribute (e.g. "optimize.day") define the
+    days; every span nested inside one (same process and thread, within its
+    time range) is attributed to that day, so build/solve/extract times
+    appear per day.
+
+    Returns:
+        pd.DataFrame: Milliseconds, one row per day, one column per stage.
+    """
+    recorded = _events if recorded is None else recorded
+    by_thread = {}
+    for event in recorded:
+        by_thread.setdefault((event["pid"], event["tid"]), []).append(event)
+
+    rows = []
+    for thread_events in by_thread.values():
+        thread_events.sort(key=lambda event: event["ts"])
+        for i, day_event in enumerate(thread_events):
+            if "day" not in day_event["args"]:
+                continue
+            day = day_event["args"]["day"]
+            end = day_event["ts"] + day_event["dur"]
+            rows.append({"day": day, "stage": day_event["name"], "wall_ms": day_event["dur"] / 1e3})
+            # Sorted by start time, so nested spans directly follow the day
+            for event in thread_events[i + 1:]:
+                if event["ts"] >= end:
+                    break
+                if event["ts"] + event["dur"] <= end:
+                    rows.append({"day": day, "stage": event["name"], "wall_ms": event["dur"] / 1e3})
+
+    if not rows:
+        return pd.DataFrame()
+    return pd.DataFrame(rows).pivot_table(
+        index="day", columns="stage", values="wall_ms", aggfunc="sum"
+    )
+
+
+@contextlib.contextmanager
+def tracing(path):
+    """
+    Record spans for the duration of the block, then write the Chrome
+    trace to path and print the per-stage summary.
+
+    Does nothing when path is None, so scripts can wrap their main()
+    unconditionally.
+    """
+    if not path:
+        yield
+        return
+
+    reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+        write_trace(path)
+        print(f"\nTiming trace: {path}")
+        print(summary().to_string(index=False, float_format="{:.3f}".format))
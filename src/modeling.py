@@ -1,7 +1,155 @@
+import hashlib
+import json
+import os
+
 import lightgbm as lgb
+import numpy as np
+
+from src.instrumentation import span, traced
+
+
+# Default LightGBM parameters
+DEFAULT_PARAMS = {
+    "objective": "regression",
+    "metric": "rmse",
+    "boosting_type": "gbdt",
+    "learning_rate": 0.05,
+    "num_leaves": 31,
+    "max_depth": -1,
+    "min_data_in_leaf": 20,
+    "verbose": -1,
+}
+
+DEFAULT_DATASET_DIR = os.path.join(".cache", "datasets")
+DEFAULT_MODEL_DIR = os.path.join(".cache", "models")
+
+# Parameters that change how a Dataset is binned; a cached binary Dataset
+# is only valid for the values it was built with
+_DATASET_PARAMS = (
+    "max_bin",
+    "min_data_in_bin",
+    "bin_construct_sample_cnt",
+    "feature_pre_filter",
+    "min_data_in_leaf",
+    "data_random_seed",
+)
+
+
+def _hash(payload):
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def _write_json_atomic(path, payload):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _array_digest(array, dtype=np.float64):
+    return hashlib.sha256(
+        np.ascontiguousarray(np.asarray(array, dtype=dtype)).tobytes()
+    ).hexdigest()
+
+
+def dataset_cache_path(feature_config, X, y, params=None, cache_dir=DEFAULT_DATASET_DIR):
+    """
+    Location of the cached binary training Dataset for one feature config
+    and training data.
+
+    The key contains a hash of the feature values and labels, so changed
+    data (e.g. a revised price file with the same date range) gets a new
+    file instead of reusing a stale one.
+
+    Args:
+        feature_config (dict): Feature settings, e.g. lag_hours and
+            rolling_window.
+        X (np.ndarray): Training features.
+        y (np.ndarray): Training labels.
+        params (dict): LightGBM parameters; only the binning related ones
+            enter the key.
+        cache_dir (str): Cache directory.
+
+    Returns:
+        str: Path of the .bin file (which may not exist yet).
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    key = _hash({
+        "features": feature_config,
+        "shape": np.shape(X),
+        "X": _array_digest(X),
+        "y": _array_digest(y),
+        "params": {name: params.get(name) for name in _DATASET_PARAMS},
+    })
+    return os.path.join(cache_dir, f"train-{key[:16]}.bin")
+
+
+def load_dataset_binary(path, y, params=None):
+    """
+    Load a binary Dataset saved with save_binary, if it holds the labels y.
+
+    The row count and a checksum of the labels (stored as float32 by
+    LightGBM) are compared against y, so a file written for other data is
+    never used.
+
+    Returns:
+        lgb.Dataset: The constructed Dataset, or None when the file does
+            not exist or does not match y.
+    """
+    if not os.path.exists(path):
+        return None
+    dataset = lgb.Dataset(path, params=params).construct()
+    if dataset.num_data() != len(y) or _array_digest(
+        dataset.get_label(), np.float32
+    ) != _array_digest(y, np.float32):
+        return None
+    return dataset
+
+
+def load_params(path):
+    """
+    Load tuned LightGBM parameters written by src.tuning.save_best_params.
+
+    Returns:
+        dict: Parameters, or None when the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)["params"]
 
 
-def train_lightgbm_model(X_train, y_train, X_test, y_test):
+def _training_dataset(X_train, y_train, params, dataset_path=None):
+    """
+    Binned training Dataset, loaded from dataset_path when it exists and
+    matches y_train, and saved there after construction otherwise.
+    """
+    if dataset_path is None:
+        return lgb.Dataset(X_train, label=y_train)
+
+    dataset = load_dataset_binary(dataset_path, y_train, params)
+    if dataset is not None:
+        return dataset
+
+    os.makedirs(os.path.dirname(dataset_path) or ".", exist_ok=True)
+    dataset = lgb.Dataset(X_train, label=y_train, params=params).construct()
+    tmp_path = f"{dataset_path}.tmp{os.getpid()}"
+    dataset.save_binary(tmp_path)
+    os.replace(tmp_path, dataset_path)
+    return dataset
+
+
+def train_lightgbm_model(
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    params=None,
+    log_period=50,
+    dataset_path=None,
+):
     """
     Train a LightGBM regression model.
 
@@ -10,40 +158,164 @@ def train_lightgbm_model(X_train, y_train, X_test, y_test):
         y_train (pd.Series): Training target values.
         X_test (pd.DataFrame): Testing features.
         y_test (pd.Series): Testing target values.
+        params (dict): Optional LightGBM parameters overriding the defaults
+            (e.g. tuned hyperparameters or num_threads).
+        log_period (int): Log the evaluation every log_period rounds;
+            0 trains silently.
+        dataset_path (str): Optional binary Dataset cache (see
+            dataset_cache_path). Binning is skipped when the file exists
+            and holds y_train.
 
     Returns:
         lgb.Booster: Trained LightGBM model.
     """
+    # LightGBM parameters
+    params = {**DEFAULT_PARAMS, **(params or {})}
+
     # Prepare LightGBM datasets
-    train_dataset = lgb.Dataset(X_train, label=y_train)
+    train_dataset = _training_dataset(X_train, y_train, params, dataset_path)
     test_dataset = lgb.Dataset(
         X_test,
         label=y_test,
         reference=train_dataset
     )
 
-    # LightGBM parameters
-    params = {
-        "objective": "regression",
-        "metric": "rmse",
-        "boosting_type": "gbdt",
-        "learning_rate": 0.05,
-        "num_leaves": 31,
-        "max_depth": -1,
-        "min_data_in_leaf": 20,
-        "verbose": -1,
-    }
-
     # Train with early stopping
-    model = lgb.train(
-        params,
-        train_dataset,
-        valid_sets=[train_dataset, test_dataset],
-        num_boost_round=500,
-        callbacks=[
-            lgb.early_stopping(stopping_rounds=50),
-            lgb.log_evaluation(50),
-        ],
+    with span("model.train", rows=len(y_train)) as s:
+        model = lgb.train(
+            params,
+            train_dataset,
+            valid_sets=[train_dataset, test_dataset],
+            num_boost_round=500,
+            callbacks=[
+                lgb.early_stopping(stopping_rounds=50, verbose=bool(log_period)),
+                lgb.log_evaluation(log_period),
+            ],
+        )
+        s.set(best_iteration=model.best_iteration)
+
+    return model
+
+
+def _state_paths(model_dir):
+    return (
+        os.path.join(model_dir, "model.txt"),
+        os.path.join(model_dir, "state.json"),
     )
 
-    return model
\ No newline at end of file
+
+def _prefix_digest(y, rows):
+    return _array_digest(np.asarray(y)[:rows])
+
+
+@traced("model.retrain")
+def retrain_lightgbm_model(
+    X,
+    y,
+    timestamps,
+    feature_config,
+    model_dir=DEFAULT_MODEL_DIR,
+    params=None,
+    validation_fraction=0.1,
+    update_rounds=50,
+    context_rows=720,
+    max_updates=30,
+    log_period=50,
+    dataset_dir=DEFAULT_DATASET_DIR,
+):
+    """
+    Daily retraining with a persistent booster.
+
+    The booster and a description of the data it was trained on are kept in
+    model_dir. When the new data only appends rows to that data (same
+    feature config and parameters, same history), training continues from
+    the saved booster (init_model) for update_rounds rounds on the appended
+    rows plus the preceding context_rows rows. Otherwise, or after
+    max_updates consecutive updates, the model is refit from scratch with
+    early stopping on the last validation_fraction of the rows, reusing the
+    cached binary Dataset when the same range was binned before.
+
+    Args:
+        X (np.ndarray): Features of all rows, in time order.
+        y (array-like): Target prices.
+        timestamps (array-like): Timestamp of each row.
+        feature_config (dict): Feature settings, part of the model identity.
+        model_dir (str): Directory of the saved booster and its state.
+        params (dict): LightGBM parameters overriding the defaults.
+        validation_fraction (float): Tail used for early stopping in a refit.
+        update_rounds (int): Boosting rounds added by an incremental update.
+        context_rows (int): Earlier rows included in an update.
+        max_updates (int): Updates after which the model is refit.
+        log_period (int): Evaluation log period of a refit, 0 for silent.
+        dataset_dir (str): Binary Dataset cache directory, or None.
+
+    Returns:
+        lgb.Booster: Up-to-date model.
+        str: "unchanged", "updated" or "refit".
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    y = np.asarray(y, dtype=np.float64)
+    timestamps = np.asarray(timestamps)
+    rows = len(y)
+
+    model_path, state_path = _state_paths(model_dir)
+    config = _hash({"features": feature_config, "params": params})
+
+    state = None
+    if os.path.exists(state_path) and os.path.exists(model_path):
+        with open(state_path) as f:
+            state = json.load(f)
+
+    appended = (
+        state is not None
+        and state["config"] == config
+        and state["first"] == str(timestamps[0])
+        and 0 < state["rows"] <= rows
+        and str(timestamps[state["rows"] - 1]) == state["last"]
+        and _prefix_digest(y, state["rows"]) == state["digest"]
+    )
+
+    if appended and state["rows"] == rows:
+        return lgb.Booster(model_file=model_path), "unchanged"
+
+    if appended and state["updates"] < max_updates:
+        start = max(0, state["rows"] - context_rows)
+        booster = lgb.train(
+            params,
+            lgb.Dataset(X[start:], label=y[start:]),
+            num_boost_round=update_rounds,
+            init_model=model_path,
+        )
+        updates, mode = state["updates"] + 1, "updated"
+    else:
+        n_val = max(1, int(rows * validation_fraction))
+        dataset_path = None
+        if dataset_dir is not None:
+            dataset_path = dataset_cache_path(
+                feature_config, X[:-n_val], y[:-n_val], params, dataset_dir
+            )
+        booster = train_lightgbm_model(
+            X[:-n_val], y[:-n_val],
+            X[-n_val:], y[-n_val:],
+            params=params,
+            log_period=log_period,
+            dataset_path=dataset_path,
+        )
+        updates, mode = 0, "refit"
+
+    os.makedirs(model_dir, exist_ok=True)
+    tmp_path = f"{model_path}.tmp{os.getpid()}"
+    booster.save_model(tmp_path)
+    os.replace(tmp_path, model_path)
+
+    # State is written last and marks the saved booster as complete
+    _write_json_atomic(state_path, {
+        "config": config,
+        "first": str(timestamps[0]),
+        "last": str(timestamps[-1]),
+        "rows": rows,
+        "digest": _prefix_digest(y, rows),
+        "updates": updates,
+    })
+
+    return booster, mode
@@ -1,18 +1,28 @@
+import math
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
 import pulp
 
+from src import instrumentation
+from src.instrumentation import span
+from src.optimization_dp import solve_dp_1mwh, solve_dp_2mwh_blocking
+from src.optimization_highs import solve_highs_1mwh, solve_highs_2mwh_blocking
 
-def optimize_battery_milp_1mwh(prices):
-    """
-    Optimize the operation of a 1 MW / 1 MWh battery for profit maximization.
 
-    Args:
-        prices (list): Hourly electricity prices for a single day (24 values).
+# ======================================================
+# MODEL CONSTRUCTION – 1 MWh
+# ======================================================
+def _build_problem_1mwh(hours):
+    """
+    Build the 1 MWh MILP constraints (everything except the objective).
 
     Returns:
-        dict: Optimal profit, charge/discharge schedules, and SOC profile.
+        tuple: (problem, variables) where variables maps names to the
+            per-hour PuLP variable dicts.
     """
-    hours = list(range(1, 25))  # 24 hours
-
     # Define the MILP problem
     problem = pulp.LpProblem(
         "Battery_Optimization_1MWh",
@@ -24,12 +34,6 @@ def optimize_battery_milp_1mwh(prices):
     P_discharge = pulp.LpVariable.dicts("P_discharge", hours, cat="Binary")
     E = pulp.LpVariable.dicts("E", hours, lowBound=0, upBound=1, cat="Continuous")
 
-    # Objective function
-    problem += pulp.lpSum(
-        prices[t - 1] * (P_discharge[t] - P_charge[t])
-        for t in hours
-    )
-
     cumulative_charge = []
     cumulative_discharge = []
 
@@ -68,32 +72,48 @@ def optimize_battery_milp_1mwh(prices):
 
     # Initial and final SOC
     problem += E[1] == 0
-    problem += E[24] == 0
+    problem += E[hours[-1]] == 0
+
+    variables = {"P_charge": P_charge, "P_discharge": P_discharge, "E": E}
+    return problem, variables
 
-    # Solve
-    problem.solve(pulp.PULP_CBC_CMD(msg=False))
 
+def _objective_1mwh(prices, variables, hours):
+    """
+    Profit of the 1 MWh schedule for the given prices.
+    """
+    P_charge = variables["P_charge"]
+    P_discharge = variables["P_discharge"]
+    return pulp.lpSum(
+        prices[t - 1] * (P_discharge[t] - P_charge[t])
+        for t in hours
+    )
+
+
+def _extract_1mwh(problem, variables, hours):
+    """
+    Read the solution of a solved 1 MWh problem into the result dict.
+    """
     return {
         "Profit": pulp.value(problem.objective),
-        "Charge Schedule": [P_charge[t].varValue for t in hours],
-        "Discharge Schedule": [P_discharge[t].varValue for t in hours],
-        "SOC Schedule": [E[t].varValue for t in hours],
+        "Charge Schedule": [variables["P_charge"][t].varValue for t in hours],
+        "Discharge Schedule": [variables["P_discharge"][t].varValue for t in hours],
+        "SOC Schedule": [variables["E"][t].varValue for t in hours],
     }
 
 
-def optimize_battery_milp_2mwh_blocking(prices):
+# ======================================================
+# MODEL CONSTRUCTION – 2 MWh (BLOCKING)
+# ======================================================
+def _build_problem_2mwh_blocking(hours):
     """
-    Optimize the operation of a 1 MW / 2 MWh battery with full & half operations
-    and blocking constraints.
-
-    Args:
-        prices (list): Hourly electricity prices for a single day (24 values).
+    Build the 2 MWh blocking MILP constraints (everything except the
+    objective).
 
     Returns:
-        dict: Optimal profit, schedules, and SOC profile.
+        tuple: (problem, variables) where variables maps names to the
+            per-hour PuLP variable dicts.
     """
-    hours = list(range(1, 25))  # 24 hours
-
     # Define the MILP problem
     problem = pulp.LpProblem(
         "Battery_Optimization_2MWh_Blocking",
@@ -109,17 +129,6 @@ def optimize_battery_milp_2mwh_blocking(prices):
     # State of charge
     E = pulp.LpVariable.dicts("E", hours, lowBound=0, upBound=2, cat="Continuous")
 
-    # Objective function
-    problem += pulp.lpSum(
-        prices[t - 1] * (
-            2 * P_discharge_full[t] +
-            P_discharge_half[t] -
-            2 * P_charge_full[t] -
-            P_charge_half[t]
-        )
-        for t in hours
-    )
-
     for t in hours:
         # SOC dynamics
         if t == 1:
@@ -149,7 +158,7 @@ def optimize_battery_milp_2mwh_blocking(prices):
         ) <= 1
 
         # Blocking after full operation
-        if t < 24:
+        if t < hours[-1]:
             z_t = P_charge_full[t] + P_discharge_full[t]
             problem += (
                 P_charge_full[t + 1] +
@@ -170,17 +179,413 @@ def optimize_battery_milp_2mwh_blocking(prices):
 
     # Initial and final SOC
     problem += E[1] == 0
-    problem += E[24] == 0
+    problem += E[hours[-1]] == 0
+
+    variables = {
+        "P_charge_full": P_charge_full,
+        "P_charge_half": P_charge_half,
+        "P_discharge_full": P_discharge_full,
+        "P_discharge_half": P_discharge_half,
+        "E": E,
+    }
+    return problem, variables
 
-    # Solve
-    problem.solve(pulp.PULP_CBC_CMD(msg=False))
 
+def _objective_2mwh_blocking(prices, variables, hours):
+    """
+    Profit of the 2 MWh blocking schedule for the given prices.
+    """
+    return pulp.lpSum(
+        prices[t - 1] * (
+            2 * variables["P_discharge_full"][t] +
+            variables["P_discharge_half"][t] -
+            2 * variables["P_charge_full"][t] -
+            variables["P_charge_half"][t]
+        )
+        for t in hours
+    )
+
+
+def _extract_2mwh_blocking(problem, variables, hours):
+    """
+    Read the solution of a solved 2 MWh blocking problem into the result dict.
+    """
     return {
         "Profit": pulp.value(problem.objective)
         if problem.status == pulp.LpStatusOptimal else None,
-        "Charge Full Schedule": [P_charge_full[t].varValue for t in hours],
-        "Charge Half Schedule": [P_charge_half[t].varValue for t in hours],
-        "Discharge Full Schedule": [P_discharge_full[t].varValue for t in hours],
-        "Discharge Half Schedule": [P_discharge_half[t].varValue for t in hours],
-        "SOC Schedule": [E[t].varValue for t in hours],
-    }
\ No newline at end of file
+        "Charge Full Schedule": [variables["P_charge_full"][t].varValue for t in hours],
+        "Charge Half Schedule": [variables["P_charge_half"][t].varValue for t in hours],
+        "Discharge Full Schedule": [variables["P_discharge_full"][t].varValue for t in hours],
+        "Discharge Half Schedule": [variables["P_discharge_half"][t].varValue for t in hours],
+        "SOC Schedule": [variables["E"][t].varValue for t in hours],
+    }
+
+
+# ======================================================
+# SOLVERS
+# ======================================================
+METHODS = ("milp", "dp", "highs")
+
+
+def _cbc_solver(solver_options=None, **kwargs):
+    """
+    CBC command with the common solver options translated to PuLP names.
+
+    Args:
+        solver_options (dict): Optional "time_limit" (s), "mip_rel_gap"
+            and "threads".
+    """
+    solver_options = solver_options or {}
+    names = {"time_limit": "timeLimit", "mip_rel_gap": "gapRel", "threads": "threads"}
+    unknown = set(solver_options) - set(names)
+    if unknown:
+        raise ValueError(f"Unknown solver options: {sorted(unknown)}")
+    for key, value in solver_options.items():
+        kwargs[names[key]] = value
+    return pulp.PULP_CBC_CMD(msg=False, **kwargs)
+
+
+_CBC_LOG_FIELDS = {
+    "nodes": (re.compile(r"Enumerated nodes:\s+(\d+)"), int),
+    "iterations": (re.compile(r"Total iterations:\s+(\d+)"), int),
+    "solver_cpu_s": (re.compile(r"Time \(CPU seconds\):\s+([\d.]+)"), float),
+}
+
+
+def _solve_cbc(problem, solver_options=None, **kwargs):
+    """
+    Solve a PuLP problem with CBC inside an "optimize.solve" span.
+
+    When instrumentation is enabled, CBC writes its log to a temporary
+    file, from which the node count, simplex iterations and solver CPU time
+    are attached to the span together with the status.
+    """
+    with span("optimize.solve", method="milp") as s:
+        if not s.active:
+            problem.solve(_cbc_solver(solver_options, **kwargs))
+            return
+
+        fd, log_path = tempfile.mkstemp(suffix=".log")
+        os.close(fd)
+        try:
+            problem.solve(_cbc_solver(solver_options, logPath=log_path, **kwargs))
+            with open(log_path) as f:
+                log = f.read()
+        finally:
+            os.remove(log_path)
+
+        s.set(status=pulp.LpStatus[problem.status])
+        for field, (pattern, cast) in _CBC_LOG_FIELDS.items():
+            match = pattern.search(log)
+            if match:
+                s.set(**{field: cast(match.group(1))})
+
+
+def _highs_options(solver_options=None):
+    """
+    Validate the common solver options for the HiGHS backend.
+    """
+    solver_options = dict(solver_options or {})
+    if solver_options.pop("threads", None) is not None:
+        raise ValueError(
+            "scipy's HiGHS interface does not expose a thread count; "
+            "parallelize across days with optimize_days instead"
+        )
+    unknown = set(solver_options) - {"time_limit", "mip_rel_gap"}
+    if unknown:
+        raise ValueError(f"Unknown solver options: {sorted(unknown)}")
+    return solver_options
+
+
+def _check_method(method):
+    if method not in METHODS:
+        raise ValueError(f"Unknown method '{method}', expected one of: {METHODS}")
+
+
+# ======================================================
+# PER-DAY OPTIMIZATION
+# ======================================================
+def optimize_battery_milp_1mwh(prices, method="milp", solver_options=None):
+    """
+    Optimize the operation of a 1 MW / 1 MWh battery for profit maximization.
+
+    Args:
+        prices (list): Hourly electricity prices for a single day (24 values).
+        method (str): "milp" solves the PuLP model with CBC, "highs" solves
+            the same model in-process with HiGHS (src.optimization_highs), and
+            "dp" uses the exact dynamic program in src.optimization_dp.
+        solver_options (dict): Optional "time_limit" (s), "mip_rel_gap" and
+            (CBC only) "threads". Ignored by "dp".
+
+    Returns:
+        dict: Optimal profit, charge/discharge schedules, and SOC profile.
+    """
+    _check_method(method)
+    if method == "dp":
+        with span("optimize.solve", method="dp"):
+            return solve_dp_1mwh(prices)
+    if method == "highs":
+        return solve_highs_1mwh(prices, **_highs_options(solver_options))
+
+    hours = list(range(1, 25))  # 24 hours
+
+    with span("optimize.build", method="milp"):
+        problem, variables = _build_problem_1mwh(hours)
+        problem.setObjective(_objective_1mwh(prices, variables, hours))
+
+    # Solve
+    _solve_cbc(problem, solver_options)
+
+    with span("optimize.extract", method="milp"):
+        return _extract_1mwh(problem, variables, hours)
+
+
+def optimize_battery_milp_2mwh_blocking(prices, method="milp", solver_options=None):
+    """
+    Optimize the operation of a 1 MW / 2 MWh battery with full & half operations
+    and blocking constraints.
+
+    Args:
+        prices (list): Hourly electricity prices for a single day (24 values).
+        method (str): "milp" solves the PuLP model with CBC, "highs" solves
+            the same model in-process with HiGHS (src.optimization_highs), and
+            "dp" uses the exact dynamic program in src.optimization_dp.
+        solver_options (dict): Optional "time_limit" (s), "mip_rel_gap" and
+            (CBC only) "threads". Ignored by "dp".
+
+    Returns:
+        dict: Optimal profit, schedules, and SOC profile.
+    """
+    _check_method(method)
+    if method == "dp":
+        with span("optimize.solve", method="dp"):
+            return solve_dp_2mwh_blocking(prices)
+    if method == "highs":
+        return solve_highs_2mwh_blocking(prices, **_highs_options(solver_options))
+
+    hours = list(range(1, 25))  # 24 hours
+
+    with span("optimize.build", method="milp"):
+        problem, variables = _build_problem_2mwh_blocking(hours)
+        problem.setObjective(_objective_2mwh_blocking(prices, variables, hours))
+
+    # Solve
+    _solve_cbc(problem, solver_options)
+
+    with span("optimize.extract", method="milp"):
+        return _extract_2mwh_blocking(problem, variables, hours)
+
+
+# ======================================================
+# REUSABLE MODEL TEMPLATE
+# ======================================================
+_TEMPLATES = {
+    "1mwh": (_build_problem_1mwh, _objective_1mwh, _extract_1mwh),
+    "2mwh_blocking": (
+        _build_problem_2mwh_blocking,
+        _objective_2mwh_blocking,
+        _extract_2mwh_blocking,
+    ),
+}
+
+
+class BatteryModel:
+    """
+    PuLP battery model that is built once and re-solved for many days.
+
+    Only the objective depends on the prices, so the variables and
+    constraints are created in build() and solve() just swaps in the new
+    price coefficients. With warm starting enabled, CBC starts from the
+    previous day's solution, which is always feasible for the next day.
+
+    Example:
+        model = BatteryModel.build({"model": "1mwh"})
+        results = [model.solve(prices) for prices in daily_prices]
+    """
+
+    def __init__(self, model, problem, variables, hours, warm_start, solver_options=None):
+        self.model = model
+        self.problem = problem
+        self.variables = variables
+        self.hours = hours
+        self.warm_start = warm_start
+        self.solver_options = solver_options
+        self._objective, self._extract = _TEMPLATES[model][1:]
+        self._has_solution = False
+
+    @classmethod
+    def build(cls, config):
+        """
+        Build the constraint structure of a battery model.
+
+        Args:
+            config (dict): Model configuration with keys
+                - "model": "1mwh" or "2mwh_blocking"
+                - "periods" (optional): periods per day, default 24
+                - "warm_start" (optional): reuse the previous solution as a
+                  CBC starting point, default True
+                - "solver_options" (optional): CBC options as accepted by
+                  optimize_battery_milp_1mwh
+
+        Returns:
+            BatteryModel: Model ready to be solved for any price vector.
+        """
+        model = config["model"]
+        if model not in _TEMPLATES:
+            raise ValueError(
+                f"Unknown model '{model}', expected one of: {sorted(_TEMPLATES)}"
+            )
+
+        hours = list(range(1, config.get("periods", 24) + 1))
+        problem, variables = _TEMPLATES[model][0](hours)
+        return cls(
+            model,
+            problem,
+            variables,
+            hours,
+            config.get("warm_start", True),
+            config.get("solver_options"),
+        )
+
+    def solve(self, prices):
+        """
+        Solve the model for one day of prices.
+
+        Args:
+            prices (list): Prices for a single day (one value per period).
+
+        Returns:
+            dict: Same result dict as the matching optimize_battery_milp_* function.
+        """
+        if len(prices) != len(self.hours):
+            raise ValueError(
+                f"Expected {len(self.hours)} prices, got {len(prices)}"
+            )
+
+        with span("optimize.build", method="template"):
+            self.problem.setObjective(self._objective(prices, self.variables, self.hours))
+        _solve_cbc(
+            self.problem,
+            self.solver_options,
+            warmStart=self.warm_start and self._has_solution,
+        )
+        self._has_solution = self.problem.status == pulp.LpStatusOptimal
+
+        with span("optimize.extract", method="template"):
+            return self._extract(self.problem, self.variables, self.hours)
+
+
+# ======================================================
+# BATCH OPTIMIZATION
+# ======================================================
+# Model variants available to the batch solver
+MODELS = {
+    "1mwh": optimize_battery_milp_1mwh,
+    "2mwh_blocking": optimize_battery_milp_2mwh_blocking,
+}
+
+
+def _solve_day(task):
+    """
+    Solve a single day inside a worker process.
+
+    Failures are returned as part of the result so that one bad day
+    does not abort the whole batch.
+    """
+    date, prices, model, kwargs = task
+    try:
+        with span("optimize.day", day=date, model=model):
+            result = MODELS[model](prices, **kwargs)
+    except Exception as exc:
+        return {"date": date, "Profit": None, "Error": f"{type(exc).__name__}: {exc}"}
+    result["date"] = date
+    return result
+
+
+def _solve_day_traced(task):
+    """
+    Solve a day in an instrumented worker and send its spans back.
+    """
+    return _solve_day(task), instrumentation.drain()
+
+
+def optimize_days(daily_prices, model="1mwh", workers=None, chunksize=None, cache=None, **kwargs):
+    """
+    Optimize many days in parallel over a process pool.
+
+    Args:
+        daily_prices (pd.Series or dict): Daily price vectors indexed by date.
+        model (str): Model variant, one of MODELS ("1mwh", "2mwh_blocking").
+        workers (int): Number of worker processes. Defaults to the CPU count;
+            1 solves serially in the current process.
+        chunksize (int): Days sent to a worker at a time. Defaults to an even
+            split of about four chunks per worker.
+        cache (SolveCache): Optional src.optimization_cache.SolveCache. Cached
+            days are not solved again and new optimal solutions are stored.
+        **kwargs: Extra keyword arguments passed to the model function.
+
+    Returns:
+        list: One result dict per day, in input order, each with a "date" key.
+            Days that failed have "Profit" set to None and an "Error" message.
+    """
+    if model not in MODELS:
+        raise ValueError(
+            f"Unknown model '{model}', expected one of: {sorted(MODELS)}"
+        )
+
+    tasks = [
+        (date, prices, model, kwargs)
+        for date, prices in daily_prices.items()
+    ]
+
+    if cache is None:
+        return _solve_tasks(tasks, workers, chunksize)
+
+    keys = [cache.key(prices, model, kwargs) for _, prices, _, _ in tasks]
+    cached = cache.get_many(keys)
+
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    solved = _solve_tasks([tasks[i] for i in missing], workers, chunksize)
+
+    results = [None] * len(tasks)
+    new_entries = []
+    for i, result in zip(missing, solved):
+        results[i] = result
+        if cache.is_cacheable(result, kwargs):
+            entry = {k: v for k, v in result.items() if k != "date"}
+            new_entries.append((keys[i], entry))
+    cache.put_many(new_entries)
+
+    for i, key in enumerate(keys):
+        if results[i] is None:
+            results[i] = {**cached[key], "date": tasks[i][0]}
+    return results
+
+
+def _solve_tasks(tasks, workers, chunksize):
+    """
+    Solve day tasks serially or over a process pool, keeping input order.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+
+    if workers == 1:
+        return [_solve_day(task) for task in tasks]
+
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(tasks) / (workers * 4)))
+
+    if not instrumentation.is_enabled():
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_solve_day, tasks, chunksize=chunksize))
+
+    # Workers record their own spans and return them with the results
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=instrumentation.start_worker
+    ) as executor:
+        for result, worker_events in executor.map(_solve_day_traced, tasks, chunksize=chunksize):
+            instrumentation.record(worker_events)
+            results.append(result)
+    return results
@@ -0,0 +1,211 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from src import optimization, optimization_dp, optimization_highs
+from src.ingestion import file_sha256
+from src.optimization import MODELS
+
+
+# Bump when the layout of cached results changes
+CACHE_VERSION = 2
+
+# Solver options that may stop before optimality
+_INEXACT_OPTIONS = ("time_limit", "mip_rel_gap")
+
+
+@lru_cache(maxsize=None)
+def code_version():
+    """
+    Fingerprint of the model code and solver versions.
+
+    Part of every cache key, so editing a model (or upgrading PuLP or
+    SciPy) never serves results of the old one.
+    """
+    import pulp
+    import scipy
+
+    payload = {
+        "cache": CACHE_VERSION,
+        "pulp": pulp.__version__,
+        "scipy": scipy.__version__,
+        "code": [
+            file_sha256(module.__file__)
+            for module in (optimization, optimization_dp, optimization_highs)
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class SolveCache:
+    """
+    On-disk cache of battery optimization results.
+
+    Results are keyed on a hash of the rounded price vector, the model
+    variant, its parameters and the model code (code_version), and stored
+    in a SQLite file. Only optimal results are stored (see is_cacheable).
+    When the cache holds more than max_entries results, the least recently
+    used ones are evicted.
+
+    Example:
+        cache = SolveCache(".cache/solves.sqlite")
+        results = optimize_days(daily_prices, model="1mwh", cache=cache)
+        print(cache.stats())
+    """
+
+    def __init__(self, path, max_entries=100_000, decimals=6):
+        """
+        Args:
+            path (str): SQLite file, created if missing.
+            max_entries (int): Maximum number of cached results.
+            decimals (int): Prices are rounded to this many decimals before
+                hashing, so float noise does not cause misses.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.max_entries = max_entries
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS solves ("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS solves_last_used ON solves (last_used)"
+        )
+        self._conn.commit()
+
+    def key(self, prices, model, params=None):
+        """
+        Content hash of one solve.
+
+        Args:
+            prices (list): Price vector of the day.
+            model (str): Model variant, e.g. "1mwh".
+            params (dict): Model parameters such as method and solver options.
+
+        Returns:
+            str: Hex digest identifying the solve.
+        """
+        rounded = np.round(np.asarray(prices, dtype=float), self.decimals) + 0.0
+        header = json.dumps(
+            {"model": model, "params": params or {}, "version": code_version()},
+            sort_keys=True,
+            default=str,
+        )
+        digest = hashlib.sha256(header.encode())
+        digest.update(rounded.tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def is_cacheable(result, params=None):
+        """
+        Whether a result is known to be optimal and may be stored.
+
+        Failed days, days without a profit (infeasible or stopped without
+        a solution) and solves with a time limit or MIP gap, which may
+        return a non-optimal schedule, are not cached.
+        """
+        if "Error" in result or result.get("Profit") is None:
+            return False
+        solver_options = (params or {}).get("solver_options") or {}
+        return not any(solver_options.get(option) is not None for option in _INEXACT_OPTIONS)
+
+    def get_many(self, keys):
+        """
+        Look up several keys at once and mark the hits as recently used.
+
+        Returns:
+            dict: Cached result dicts by key (misses are left out).
+        """
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), 500):
+            batch = unique[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, result FROM solves WHERE key IN ({placeholders})",
+                batch,
+            )
+            found.update((key, json.loads(result)) for key, result in rows)
+
+        now = time.time()
+        self._conn.executemany(
+            "UPDATE solves SET last_used = ? WHERE key = ?",
+            [(now, key) for key in found],
+        )
+        self._conn.commit()
+
+        self.hits += sum(key in found for key in keys)
+        self.misses += sum(key not in found for key in keys)
+        return found
+
+    def put_many(self, items):
+        """
+        Store (key, result) pairs and evict the least recently used entries
+        beyond max_entries.
+        """
+        now = time.time()
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO solves (key, result, last_used) VALUES (?, ?, ?)",
+            [(key, json.dumps(result), now) for key, result in items],
+        )
+
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM solves").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM solves WHERE key IN ("
+                "SELECT key FROM solves ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+        self._conn.commit()
+
+    def optimize(self, prices, model="1mwh", **kwargs):
+        """
+        Cached version of a single-day src.optimization model call.
+
+        Args:
+            prices (list): Prices for a single day.
+            model (str): Model variant, one of src.optimization.MODELS.
+            **kwargs: Extra keyword arguments passed to the model function.
+
+        Returns:
+            dict: Result dict of the model function.
+        """
+        key = self.key(prices, model, kwargs)
+        cached = self.get_many([key])
+        if key in cached:
+            return cached[key]
+
+        result = MODELS[model](prices, **kwargs)
+        if self.is_cacheable(result, kwargs):
+            self.put_many([(key, result)])
+        return result
+
+    def stats(self):
+        """
+        Hit/miss counters of this session and the number of stored results.
+        """
+        (entries,) = self._conn.execute("SELECT COUNT(*) FROM solves").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def clear(self):
+        """
+        Remove all cached results.
+        """
+        self._conn.execute("DELETE FROM solves")
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
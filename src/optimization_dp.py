@@ -0,0 +1,279 @@
+import numpy as np
+
+
+def solve_dp_1mwh(prices):
+    """
+    Solve the 1 MW / 1 MWh battery problem exactly by dynamic programming.
+
+    The MILP in optimize_battery_milp_1mwh only has binary full-power actions,
+    so the SOC is always 0 or 1 MWh. A forward pass over these two states
+    finds the same optimum without a solver: the first period is idle
+    (E[1] == 0) and the day must end empty. Ties are resolved in favour of
+    staying idle.
+
+    Args:
+        prices (list): Prices for a single day (any number of periods).
+
+    Returns:
+        dict: Optimal profit, charge/discharge schedules, and SOC profile.
+    """
+    p = np.asarray(prices, dtype=float).tolist()
+    n = len(p)
+
+    # Best profit so far when ending the period empty (v0) or full (v1)
+    v0, v1 = 0.0, -np.inf
+
+    # Whether the state was reached by acting (discharge into 0, charge into 1)
+    acted = np.zeros((n, 2), dtype=bool)
+
+    for t in range(1, n):
+        discharge = v1 + p[t]
+        charge = v0 - p[t]
+        acted[t, 0] = discharge > v0
+        acted[t, 1] = charge > v1
+        v0, v1 = (
+            discharge if acted[t, 0] else v0,
+            charge if acted[t, 1] else v1,
+        )
+
+    # Backtrack from an empty battery at the end of the day
+    charge_schedule = np.zeros(n)
+    discharge_schedule = np.zeros(n)
+    soc_schedule = np.zeros(n)
+    soc = 0
+    for t in range(n - 1, 0, -1):
+        soc_schedule[t] = soc
+        if acted[t, soc]:
+            if soc == 1:
+                charge_schedule[t] = 1.0
+            else:
+                discharge_schedule[t] = 1.0
+            soc = 1 - soc
+
+    return {
+        "Profit": v0,
+        "Charge Schedule": charge_schedule.tolist(),
+        "Discharge Schedule": discharge_schedule.tolist(),
+        "SOC Schedule": soc_schedule.tolist(),
+    }
+
+
+# Discrete states of the 2 MWh blocking model: (SOC in MWh, blocked).
+# A state is blocked for one period after a full charge or discharge.
+STATES_2MWH = [(0, 0), (1, 0), (2, 0), (0, 1), (2, 1)]
+
+# Actions as SOC changes: idle, half/full charge, half/full discharge
+IDLE, CHARGE_HALF, CHARGE_FULL, DISCHARGE_HALF, DISCHARGE_FULL = 0, 1, 2, -1, -2
+
+# For every state, the (previous state, action) pairs that lead into it.
+# Idle moves come first so that ties are resolved in favour of idling.
+TRANSITIONS_2MWH = [
+    [(0, IDLE), (3, IDLE), (1, DISCHARGE_HALF)],
+    [(1, IDLE), (0, CHARGE_HALF), (2, DISCHARGE_HALF)],
+    [(2, IDLE), (4, IDLE), (1, CHARGE_HALF)],
+    [(2, DISCHARGE_FULL)],
+    [(0, CHARGE_FULL)],
+]
+
+
+def solve_dp_2mwh_blocking(prices):
+    """
+    Solve the 1 MW / 2 MWh full/half blocking problem exactly by dynamic
+    programming.
+
+    The MILP in optimize_battery_milp_2mwh_blocking allows one of four
+    actions per period (full/half charge or discharge, i.e. 2 or 1 MWh), keeps
+    SOC in {0, 1, 2} and forbids any action in the period after a full one.
+    A forward pass over (SOC, blocked) states gives the same optimum. The
+    first period is idle (E[1] == 0) and the day must end empty. Works for
+    any horizon, e.g. 24 hourly or 96 quarter-hourly periods.
+
+    Args:
+        prices (list): Prices for a single day (any number of periods).
+
+    Returns:
+        dict: Optimal profit, schedules, and SOC profile.
+    """
+    p = np.asarray(prices, dtype=float).tolist()
+    n = len(p)
+
+    value = [0.0] + [-np.inf] * (len(STATES_2MWH) - 1)
+
+    # Index of the chosen incoming transition per period and state
+    choice = [[0] * len(STATES_2MWH) for _ in range(n)]
+
+    for t in range(1, n):
+        new_value = []
+        for state, incoming in enumerate(TRANSITIONS_2MWH):
+            best, best_k = -np.inf, 0
+            for k, (source, action) in enumerate(incoming):
+                candidate = value[source] - action * p[t]
+                if candidate > best:
+                    best, best_k = candidate, k
+            new_value.append(best)
+            choice[t][state] = best_k
+        value = new_value
+
+    # End empty, blocked or not (blocking past the horizon does not matter)
+    state = 0 if value[0] >= value[3] else 3
+
+    actions = np.zeros(n, dtype=int)
+    soc_schedule = np.zeros(n)
+    for t in range(n - 1, 0, -1):
+        soc_schedule[t] = STATES_2MWH[state][0]
+        state, actions[t] = TRANSITIONS_2MWH[state][choice[t][state]]
+
+    return {
+        "Profit": max(value[0], value[3]),
+        "Charge Full Schedule": (actions == CHARGE_FULL).astype(float).tolist(),
+        "Charge Half Schedule": (actions == CHARGE_HALF).astype(float).tolist(),
+        "Discharge Full Schedule": (actions == DISCHARGE_FULL).astype(float).tolist(),
+        "Discharge Half Schedule": (actions == DISCHARGE_HALF).astype(float).tolist(),
+        "SOC Schedule": soc_schedule.tolist(),
+    }
+
+
+def solve_dp_batch_1mwh(price_matrix):
+    """
+    Solve the 1 MWh model for many days at once.
+
+    Runs the same recursion and tie-breaking as solve_dp_1mwh, but over
+    every row of a (days x periods) price matrix at the same time, so the
+    Python loop is over periods only.
+
+    Args:
+        price_matrix (np.ndarray): Prices with one day per row.
+
+    Returns:
+        dict: "Profit" as a (days,) array and the schedules as
+            (days x periods) int8 arrays, with the same keys as solve_dp_1mwh.
+    """
+    p = np.asarray(price_matrix, dtype=float)
+    n_days, n = p.shape
+
+    v0 = np.zeros(n_days)
+    v1 = np.full(n_days, -np.inf)
+    acted = np.zeros((n, 2, n_days), dtype=bool)
+
+    # Period-major copy so that each step reads contiguous memory
+    p_by_period = np.ascontiguousarray(p.T)
+
+    for t in range(1, n):
+        discharge = v1 + p_by_period[t]
+        charge = v0 - p_by_period[t]
+        np.greater(discharge, v0, out=acted[t, 0])
+        np.greater(charge, v1, out=acted[t, 1])
+        v0 = np.where(acted[t, 0], discharge, v0)
+        v1 = np.where(acted[t, 1], charge, v1)
+
+    rows = np.arange(n_days)
+    charge_schedule = np.zeros((n_days, n), dtype=np.int8)
+    discharge_schedule = np.zeros((n_days, n), dtype=np.int8)
+    soc_schedule = np.zeros((n_days, n), dtype=np.int8)
+    soc = np.zeros(n_days, dtype=np.int8)
+    for t in range(n - 1, 0, -1):
+        soc_schedule[:, t] = soc
+        act = acted[t][soc, rows]
+        charge_schedule[:, t] = act & (soc == 1)
+        discharge_schedule[:, t] = act & (soc == 0)
+        soc = np.where(act, 1 - soc, soc)
+
+    return {
+        "Profit": v0,
+        "Charge Schedule": charge_schedule,
+        "Discharge Schedule": discharge_schedule,
+        "SOC Schedule": soc_schedule,
+    }
+
+
+def solve_dp_batch_2mwh_blocking(price_matrix):
+    """
+    Solve the 2 MWh blocking model for many days at once.
+
+    Runs the same recursion and tie-breaking as solve_dp_2mwh_blocking, but
+    over every row of a (days x periods) price matrix at the same time.
+
+    Args:
+        price_matrix (np.ndarray): Prices with one day per row.
+
+    Returns:
+        dict: "Profit" as a (days,) array and the schedules as
+            (days x periods) int8 arrays, with the same keys as
+            solve_dp_2mwh_blocking.
+    """
+    p = np.asarray(price_matrix, dtype=float)
+    n_days, n = p.shape
+    n_states = len(STATES_2MWH)
+
+    value = np.full((n_states, n_days), -np.inf)
+    value[0] = 0.0
+    choice = np.zeros((n, n_states, n_days), dtype=np.int8)
+
+    # Period-major copy so that each step reads contiguous memory
+    p_by_period = np.ascontiguousarray(p.T)
+
+    for t in range(1, n):
+        # Profit of each action in this period (idle adds nothing)
+        gain = {
+            action: -action * p_by_period[t]
+            for action in (CHARGE_HALF, CHARGE_FULL, DISCHARGE_HALF, DISCHARGE_FULL)
+        }
+        new_value = np.empty_like(value)
+        for state, incoming in enumerate(TRANSITIONS_2MWH):
+            best = None
+            for k, (source, action) in enumerate(incoming):
+                candidate = value[source] if action == IDLE else value[source] + gain[action]
+                if best is None:
+                    best = candidate
+                    continue
+                better = candidate > best
+                best = np.where(better, candidate, best)
+                choice[t, state] = np.where(better, k, choice[t, state])
+            new_value[state] = best
+        value = new_value
+
+    # Lookup tables for backtracking: (state, choice) -> previous state/action
+    width = max(len(incoming) for incoming in TRANSITIONS_2MWH)
+    prev_state = np.zeros((n_states, width), dtype=np.int8)
+    prev_action = np.zeros((n_states, width), dtype=np.int8)
+    for state, incoming in enumerate(TRANSITIONS_2MWH):
+        for k, (source, action) in enumerate(incoming):
+            prev_state[state, k] = source
+            prev_action[state, k] = action
+    state_soc = np.array([soc for soc, _ in STATES_2MWH], dtype=np.int8)
+
+    rows = np.arange(n_days)
+    state = np.where(value[0] >= value[3], 0, 3)
+    actions = np.zeros((n_days, n), dtype=np.int8)
+    soc_schedule = np.zeros((n_days, n), dtype=np.int8)
+    for t in range(n - 1, 0, -1):
+        soc_schedule[:, t] = state_soc[state]
+        k = choice[t][state, rows]
+        actions[:, t] = prev_action[state, k]
+        state = prev_state[state, k]
+
+    return {
+        "Profit": np.maximum(value[0], value[3]),
+        "Charge Full Schedule": (actions == CHARGE_FULL).view(np.int8),
+        "Charge Half Schedule": (actions == CHARGE_HALF).view(np.int8),
+        "Discharge Full Schedule": (actions == DISCHARGE_FULL).view(np.int8),
+        "Discharge Half Schedule": (actions == DISCHARGE_HALF).view(np.int8),
+        "SOC Schedule": soc_schedule,
+    }
+
+
+# Batched DP solvers and the net discharged energy (MWh per period) of
+# their schedules; profit of a schedule at prices p is (net * p).sum(axis=1)
+BATCH_DISPATCH = {
+    "1mwh": (
+        solve_dp_batch_1mwh,
+        lambda r: r["Discharge Schedule"] - r["Charge Schedule"],
+    ),
+    "2mwh_blocking": (
+        solve_dp_batch_2mwh_blocking,
+        lambda r: (
+            2 * r["Discharge Full Schedule"] + r["Discharge Half Schedule"]
+            - 2 * r["Charge Full Schedule"] - r["Charge Half Schedule"]
+        ),
+    ),
+}
@@ -0,0 +1,415 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint
+
+from src.instrumentation import span
+from src.optimization_highs import milp_options, solve_milp
+
+
+# Columns of an asset spec table: required, and optional with their defaults.
+# SOC values are fractions of the energy capacity; max_cycles caps the
+# energy discharged per day at max_cycles * energy_mwh (NaN = no cap).
+REQUIRED_SPEC_COLUMNS = ("asset", "node", "power_mw", "energy_mwh")
+SPEC_DEFAULTS = {
+    "initial_soc": 0.0,
+    "final_soc": 0.0,
+    "charge_efficiency": 1.0,
+    "discharge_efficiency": 1.0,
+    "max_cycles": np.nan,
+    "group": None,
+}
+
+# Charge and discharge above this (MW) in the same period count as
+# simultaneous; below it is solver tolerance
+SIMULTANEOUS_MW = 1e-6
+
+
+# ======================================================
+# BATTERY MILP
+# ======================================================
+def _asset_block(spec, days, periods, period_hours, exclusive):
+    """
+    Constraints of one battery over consecutive independent days.
+
+    Variables are ordered [charge (MW), discharge (MW), SOC at the end of
+    the period (MWh), mode], days * periods each. Every day starts at the
+    initial SOC and ends at the final SOC:
+
+        soc[t] = soc[t-1] + h * (eta_c * charge[t] - discharge[t] / eta_d)
+
+    In the periods selected by exclusive, the binary mode (1 = charging)
+    keeps the battery from charging and discharging at the same time:
+
+        charge[t] <= power * mode[t]
+        discharge[t] <= power * (1 - mode[t])
+
+    Returns:
+        tuple: (A, lower, upper, var_lower, var_upper) with A sparse.
+    """
+    n = days * periods
+    h = period_hours
+    energy = spec["energy_mwh"]
+    power = spec["power_mw"]
+    eye = sparse.identity(n, format="csr")
+
+    # soc[t] - soc[t-1] - h*eta_c*charge[t] + h/eta_d*discharge[t] = 0,
+    # where soc[t-1] is the initial SOC (moved to the bound) at day starts
+    previous = np.ones(n - 1)
+    previous[periods - 1::periods] = 0.0
+    dynamics = sparse.hstack([
+        -h * spec["charge_efficiency"] * eye,
+        (h / spec["discharge_efficiency"]) * eye,
+        eye - sparse.diags(previous, -1, shape=(n, n)),
+        sparse.csr_array((n, n)),
+    ])
+    start = np.zeros(n)
+    start[::periods] = spec["initial_soc"] * energy
+
+    # charge - power * mode <= 0 and discharge + power * mode <= power
+    rows = eye[exclusive]
+    none = sparse.csr_array(rows.shape)
+    modes = sparse.vstack([
+        sparse.hstack([rows, none, none, -power * rows]),
+        sparse.hstack([none, rows, none, power * rows]),
+    ])
+    k = rows.shape[0]
+
+    blocks = [dynamics, modes]
+    lower = [start, np.full(2 * k, -np.inf)]
+    upper = [start, np.concatenate([np.zeros(k), np.full(k, power)])]
+
+    if not math.isnan(spec["max_cycles"]):
+        per_day = sparse.kron(sparse.identity(days), np.full((1, periods), h))
+        blocks.append(sparse.hstack([
+            sparse.csr_array((days, n)), per_day, sparse.csr_array((days, 2 * n)),
+        ]))
+        lower.append(np.full(days, -np.inf))
+        upper.append(np.full(days, spec["max_cycles"] * energy))
+
+    soc_upper = np.full(n, energy)
+    soc_lower = np.zeros(n)
+    soc_lower[periods - 1::periods] = soc_upper[periods - 1::periods] = spec["final_soc"] * energy
+    var_lower = np.concatenate([np.zeros(2 * n), soc_lower, np.zeros(n)])
+    var_upper = np.concatenate([np.full(2 * n, power), soc_upper, np.ones(n)])
+
+    return (
+        sparse.vstack(blocks, format="csr"),
+        np.concatenate(lower),
+        np.concatenate(upper),
+        var_lower,
+        var_upper,
+    )
+
+
+def _solve_lp(specs, price_blocks, period_hours, grid_limit=None, solver_options=None):
+    """
+    Co-optimize batteries over the same days in one block-diagonal MILP.
+
+    The first solve has no mode constraints, so it is an LP. Where a battery
+    charges and discharges in the same period, both flows are reduced so
+    that the SOC path stays the same, if that loses no profit: always at a
+    round-trip efficiency of 1, and at non-negative prices when there is no
+    grid limit (the net export grows). The other such periods get a binary
+    mode and the problem is solved again, until none is left. The result is
+    feasible for the full MILP and at least as good as the optimum of a
+    relaxation of it, so it is optimal; without negative prices no binary
+    is needed.
+
+    Args:
+        specs (list): Spec dicts, one per battery.
+        price_blocks (list): (days x periods) prices of each battery.
+        period_hours (float): Length of a period in hours.
+        grid_limit (float): Optional limit (MW) on the combined net export
+            and import of all batteries in every period.
+
+    Returns:
+        tuple: (list of (charge, discharge, soc) (days x periods) arrays
+            per battery, or None when the solve failed; solver message)
+    """
+    days, periods = price_blocks[0].shape
+    n = days * periods
+
+    # Minimize the negative profit: h * price * (charge - discharge)
+    c = np.concatenate([
+        np.concatenate([period_hours * p.ravel(), -period_hours * p.ravel(), np.zeros(2 * n)])
+        for p in price_blocks
+    ])
+    options = milp_options(**(solver_options or {}))
+
+    prices = np.stack([p.ravel() for p in price_blocks])
+    round_trip = np.array([
+        [spec["charge_efficiency"] * spec["discharge_efficiency"]] for spec in specs
+    ])
+    nettable = (round_trip == 1) | ((prices >= 0) & (grid_limit is None))
+
+    exclusive = np.zeros((len(specs), n), dtype=bool)
+    while True:
+        blocks = [
+            _asset_block(spec, days, periods, period_hours, exclusive[k])
+            for k, spec in enumerate(specs)
+        ]
+        A = sparse.block_diag([block[0] for block in blocks], format="csr")
+        lower = np.concatenate([block[1] for block in blocks])
+        upper = np.concatenate([block[2] for block in blocks])
+
+        if grid_limit is not None:
+            # -limit <= sum of (discharge - charge) over batteries <= limit
+            eye = sparse.identity(n, format="csr")
+            net = sparse.hstack([
+                sparse.hstack([-eye, eye, sparse.csr_array((n, 2 * n))]) for _ in specs
+            ])
+            A = sparse.vstack([A, net], format="csr")
+            lower = np.concatenate([lower, np.full(n, -grid_limit)])
+            upper = np.concatenate([upper, np.full(n, grid_limit)])
+
+        res = solve_milp(
+            c,
+            LinearConstraint(A, lower, upper),
+            Bounds(
+                np.concatenate([block[3] for block in blocks]),
+                np.concatenate([block[4] for block in blocks]),
+            ),
+            np.concatenate([np.concatenate([np.zeros(3 * n), mask]) for mask in exclusive]),
+            options,
+        )
+        if res.x is None:
+            return None, res.message
+        x = res.x.reshape(len(specs), 4, n)
+        charge, discharge = x[:, 0], x[:, 1]
+
+        simultaneous = np.minimum(charge, discharge) > SIMULTANEOUS_MW
+        if not (simultaneous & ~nettable).any():
+            break
+        exclusive |= simultaneous & ~nettable
+
+    # charge - d and discharge - d * eta_c * eta_d keep the SOC path
+    d = np.where(simultaneous, np.minimum(charge, discharge / round_trip), 0.0)
+    charge = charge - d
+    discharge = discharge - d * round_trip
+
+    schedules = []
+    for k in range(len(specs)):
+        # Drop solver noise around zero
+        schedules.append(tuple(
+            np.where(np.abs(v) < 1e-9, 0.0, v).reshape(days, periods)
+            for v in (charge[k], discharge[k], x[k, 2])
+        ))
+    return schedules, res.message
+
+
+def solve_battery_lp(price_matrix, spec=None, period_hours=None, solver_options=None):
+    """
+    Optimal continuous dispatch of one battery for many days, never
+    charging and discharging in the same period.
+
+    Args:
+        price_matrix (np.ndarray): (days x periods) prices.
+        spec (dict): Battery spec, keys as in SPEC_DEFAULTS plus
+            "power_mw" and "energy_mwh" (default 1 MW / 1 MWh).
+        period_hours (float): Length of a period, default 24 / periods.
+        solver_options (dict): Optional "time_limit" (s).
+
+    Returns:
+        dict: "Profit" as a (days,) array and "Charge", "Discharge" (MW)
+            and "SOC" (MWh) as (days x periods) arrays; all NaN when the
+            solve failed.
+    """
+    prices = np.asarray(price_matrix, dtype=float)
+    days, periods = prices.shape
+    spec = {**SPEC_DEFAULTS, "power_mw": 1.0, "energy_mwh": 1.0, **(spec or {})}
+    period_hours = period_hours or 24 / periods
+
+    schedules, _ = _solve_lp([spec], [prices], period_hours, solver_options=solver_options)
+    if schedules is None:
+        empty = np.full((days, periods), np.nan)
+        return {"Profit": np.full(days, np.nan), "Charge": empty, "Discharge": empty, "SOC": empty}
+
+    charge, discharge, soc = schedules[0]
+    return {
+        "Profit": period_hours * ((discharge - charge) * prices).sum(axis=1),
+        "Charge": charge,
+        "Discharge": discharge,
+        "SOC": soc,
+    }
+
+
+# ======================================================
+# FLEET OPTIMIZATION
+# ======================================================
+def _normalize_specs(specs):
+    """
+    Validate a spec table and fill in the optional columns.
+    """
+    specs = pd.DataFrame(specs).reset_index(drop=True)
+    missing = [column for column in REQUIRED_SPEC_COLUMNS if column not in specs]
+    if missing:
+        raise ValueError(f"Spec table is missing columns: {missing}")
+    if specs["asset"].duplicated().any():
+        raise ValueError("Asset names must be unique")
+
+    for column, default in SPEC_DEFAULTS.items():
+        if column not in specs:
+            specs[column] = default
+        elif default is not None:
+            specs[column] = specs[column].fillna(default)
+    specs["group"] = specs["group"].astype(object).where(specs["group"].notna(), None)
+
+    for column in ("initial_soc", "final_soc"):
+        if not specs[column].between(0, 1).all():
+            raise ValueError(f"{column} must be a fraction of the energy capacity (0 to 1)")
+    for column in ("charge_efficiency", "discharge_efficiency"):
+        if not ((specs[column] > 0) & (specs[column] <= 1)).all():
+            raise ValueError(f"{column} must be in (0, 1]")
+    return specs
+
+
+def _solve_unit(task):
+    """
+    Solve one decoupled asset or one coupled group for a chunk of days.
+    """
+    asset_ids, specs, price_blocks, period_hours, grid_limit, solver_options = task
+    with span("fleet.unit", assets=len(asset_ids), days=len(price_blocks[0])):
+        schedules, message = _solve_lp(
+            specs, price_blocks, period_hours, grid_limit, solver_options
+        )
+    return asset_ids, schedules, message
+
+
+def optimize_fleet(
+    specs,
+    prices,
+    dates=None,
+    grid_limits=None,
+    period_hours=None,
+    chunk_days=31,
+    workers=None,
+    solver_options=None,
+):
+    """
+    Optimize the dispatch of a fleet of batteries at several price nodes.
+
+    Each asset is the battery model of solve_battery_lp with its own
+    power, energy, SOC targets, efficiencies and cycle limit. Assets
+    without a group are independent: each is solved on its own, as a
+    block-diagonal problem over chunk_days days. Assets that share a grid
+    connection (same "group", with a limit in grid_limits) are
+    co-optimized in one problem in which their combined net export or import
+    never exceeds the limit. The resulting subproblems (asset or group x
+    day chunk) are solved in parallel worker processes.
+
+    Args:
+        specs (pd.DataFrame): One row per asset with columns "asset",
+            "node", "power_mw", "energy_mwh" and optionally the columns of
+            SPEC_DEFAULTS.
+        prices (dict): Node -> (days x periods) price matrix, e.g. from
+            load_price_matrix; all of the same shape.
+        dates (list): Date of each matrix row, default 0..days-1.
+        grid_limits (dict): Group -> connection limit in MW.
+        period_hours (float): Length of a period, default 24 / periods.
+        chunk_days (int): Days per subproblem.
+        workers (int): Worker processes, default the CPU count; 1 solves
+            serially in the current process.
+        solver_options (dict): Optional HiGHS "time_limit" (s).
+
+    Returns:
+        pd.DataFrame: One row per asset, day and period with columns asset,
+            node, group, date, period, price, charge_mw, discharge_mw,
+            soc_mwh, revenue and status (the solver message; schedule
+            values are NaN for failed subproblems). The profit of an asset
+            and day is the sum of its revenue.
+    """
+    specs = _normalize_specs(specs)
+    grid_limits = grid_limits or {}
+
+    prices = {node: np.asarray(matrix, dtype=float) for node, matrix in prices.items()}
+    missing = sorted(set(specs["node"]) - set(prices), key=str)
+    if missing:
+        raise ValueError(f"No prices for nodes: {missing}")
+    days, periods = next(iter(prices.values())).shape
+    if any(matrix.shape != (days, periods) for matrix in prices.values()):
+        raise ValueError("All price matrices must have the same shape")
+    dates = np.arange(days) if dates is None else np.asarray(dates)
+    period_hours = period_hours or 24 / periods
+
+    groups = [group for group in specs["group"].unique() if group is not None]
+    unlimited = [group for group in groups if group not in grid_limits]
+    if unlimited:
+        raise ValueError(f"No grid limit for groups: {unlimited}")
+
+    # Units: each ungrouped asset alone, each group together
+    units = [([i], None) for i in specs.index[specs["group"].isna()]]
+    units += [
+        (list(specs.index[specs["group"] == group]), grid_limits[group])
+        for group in groups
+    ]
+    records = specs.to_dict("records")
+
+    tasks = [
+        (
+            asset_ids,
+            [records[i] for i in asset_ids],
+            [prices[records[i]["node"]][start:start + chunk_days] for i in asset_ids],
+            period_hours,
+            limit,
+            solver_options,
+        )
+        for asset_ids, limit in units
+        for start in range(0, days, chunk_days)
+    ]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+    if workers == 1:
+        solved = [_solve_unit(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solved = list(executor.map(_solve_unit, tasks))
+
+    # Per asset, the schedule chunks in day order
+    chunks = {i: [] for i in specs.index}
+    for (asset_ids, _, price_blocks, *_), (_, schedules, message) in zip(tasks, solved):
+        for k, i in enumerate(asset_ids):
+            if schedules is None:
+                empty = np.full(price_blocks[k].shape, np.nan)
+                schedules_k = (empty, empty, empty)
+            else:
+                schedules_k = schedules[k]
+            chunks[i].append((*schedules_k, message))
+
+    columns = {key: [] for key in (
+        "asset", "node", "group", "date", "period", "price",
+        "charge_mw", "discharge_mw", "soc_mwh", "status",
+    )}
+    size = days * periods
+    for i, spec in enumerate(records):
+        charge = np.concatenate([chunk[0] for chunk in chunks[i]]).ravel()
+        discharge = np.concatenate([chunk[1] for chunk in chunks[i]]).ravel()
+        soc = np.concatenate([chunk[2] for chunk in chunks[i]]).ravel()
+        status = np.concatenate([
+            np.full(chunk[0].size, chunk[3], dtype=object) for chunk in chunks[i]
+        ])
+
+        columns["asset"].append(np.full(size, spec["asset"], dtype=object))
+        columns["node"].append(np.full(size, spec["node"], dtype=object))
+        columns["group"].append(np.full(size, spec["group"], dtype=object))
+        columns["date"].append(np.repeat(dates, periods))
+        columns["period"].append(np.tile(np.arange(periods), days))
+        columns["price"].append(prices[spec["node"]].ravel())
+        columns["charge_mw"].append(charge)
+        columns["discharge_mw"].append(discharge)
+        columns["soc_mwh"].append(soc)
+        columns["status"].append(status)
+
+    table = pd.DataFrame({key: np.concatenate(values) for key, values in columns.items()})
+    table.insert(
+        len(table.columns) - 1,
+        "revenue",
+        period_hours * table["price"] * (table["discharge_mw"] - table["charge_mw"]),
+    )
+    for column in ("asset", "node", "group", "status"):
+        table[column] = table[column].astype("category")
+    return table
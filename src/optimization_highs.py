@@ -0,0 +1,290 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+from src.instrumentation import span
+
+
+def milp_options(time_limit=None, mip_rel_gap=None, presolve=True):
+    """
+    Translate solver options into scipy.optimize.milp options.
+
+    Args:
+        time_limit (float): Optional time limit in seconds.
+        mip_rel_gap (float): Optional relative MIP gap.
+        presolve (bool): Run the HiGHS presolve.
+
+    Returns:
+        dict: Options for scipy.optimize.milp.
+    """
+    options = {"presolve": presolve}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    if mip_rel_gap is not None:
+        options["mip_rel_gap"] = mip_rel_gap
+    return options
+
+
+def _profit(res):
+    """
+    Profit of a solve, or None unless HiGHS proved it optimal (as for CBC,
+    an incumbent stopped by the time limit carries no profit).
+    """
+    return -res.fun if res.status == 0 else None
+
+
+def _clean(x):
+    """
+    Snap solver output to the integer grid of these models (all variables,
+    including SOC, take whole MWh values) and drop negative zeros.
+    """
+    return np.round(x) + 0.0
+
+
+def solve_milp(c, constraints, bounds, integrality, options):
+    """
+    Run scipy's HiGHS MILP inside an "optimize.solve" span, recording the
+    solver status and branch-and-bound node count.
+
+    Args:
+        c (np.ndarray): Objective coefficients (minimized).
+        constraints (LinearConstraint): Constraint rows.
+        bounds (Bounds): Variable bounds.
+        integrality (np.ndarray): 1 for integer variables, 0 otherwise.
+        options (dict): Output of milp_options.
+
+    Returns:
+        scipy.optimize.OptimizeResult: The milp result.
+    """
+    with span("optimize.solve", method="highs") as s:
+        res = milp(
+            c,
+            constraints=constraints,
+            bounds=bounds,
+            integrality=integrality,
+            options=options,
+        )
+        if s.active:
+            s.set(status=res.message, nodes=getattr(res, "mip_node_count", None))
+    return res
+
+
+class _ConstraintRows:
+    """
+    Collects sparse constraint rows lb <= a @ x <= ub one at a time.
+    """
+
+    def __init__(self):
+        self.rows, self.cols, self.vals = [], [], []
+        self.lower, self.upper = [], []
+
+    def add(self, entries, lb, ub):
+        row = len(self.lower)
+        for col, val in entries:
+            self.rows.append(row)
+            self.cols.append(col)
+            self.vals.append(val)
+        self.lower.append(lb)
+        self.upper.append(ub)
+
+    def to_constraint(self, n_vars):
+        A = sparse.csr_array(
+            (self.vals, (self.rows, self.cols)),
+            shape=(len(self.lower), n_vars),
+        )
+        return LinearConstraint(A, self.lower, self.upper)
+
+
+# ======================================================
+# 1 MWh – MATRIX FORM
+# ======================================================
+@lru_cache(maxsize=None)
+def _matrices_1mwh(n):
+    """
+    Constraint matrix of the 1 MWh model for n periods.
+
+    Variables are ordered [charge (n), discharge (n), SOC (n)]. The cumulative
+    charge/discharge constraints of the PuLP model are implied by the SOC
+    dynamics and bounds and are therefore left out.
+
+    Returns:
+        tuple: (constraints, bounds, integrality)
+    """
+    C, D, E = 0, n, 2 * n
+    rows = _ConstraintRows()
+
+    for t in range(n):
+        # SOC dynamics: E[t] - E[t-1] - charge[t] + discharge[t] == 0
+        entries = [(E + t, 1.0), (C + t, -1.0), (D + t, 1.0)]
+        if t > 0:
+            entries.append((E + t - 1, -1.0))
+        rows.add(entries, 0.0, 0.0)
+
+        # No simultaneous charge & discharge
+        rows.add([(C + t, 1.0), (D + t, 1.0)], -np.inf, 1.0)
+
+        # Discharge only if energy available
+        if t > 0:
+            rows.add([(D + t, 1.0), (E + t - 1, -1.0)], -np.inf, 0.0)
+
+    constraints = rows.to_constraint(3 * n)
+
+    # Binary actions, SOC in [0, 1], empty at the start and end of the day
+    ub = np.ones(3 * n)
+    ub[E] = ub[E + n - 1] = 0.0
+    bounds = Bounds(np.zeros(3 * n), ub)
+
+    integrality = np.zeros(3 * n)
+    integrality[:E] = 1
+
+    return constraints, bounds, integrality
+
+
+def solve_highs_1mwh(prices, time_limit=None, mip_rel_gap=None):
+    """
+    Solve the 1 MW / 1 MWh battery MILP in-process with HiGHS.
+
+    Args:
+        prices (list): Prices for a single day (any number of periods).
+        time_limit (float): Time limit in seconds.
+        mip_rel_gap (float): Relative MIP gap at which to stop.
+
+    Returns:
+        dict: Optimal profit, charge/discharge schedules, and SOC profile.
+            Profit is None unless the solve is optimal.
+    """
+    with span("optimize.build", method="highs"):
+        p = np.asarray(prices, dtype=float)
+        n = len(p)
+        constraints, bounds, integrality = _matrices_1mwh(n)
+
+        # Maximize discharge revenue minus charge cost
+        c = np.concatenate([p, -p, np.zeros(n)])
+
+    res = solve_milp(
+        c, constraints, bounds, integrality, milp_options(time_limit, mip_rel_gap)
+    )
+
+    if res.x is None:
+        return {
+            "Profit": None,
+            "Charge Schedule": [None] * n,
+            "Discharge Schedule": [None] * n,
+            "SOC Schedule": [None] * n,
+        }
+
+    x = _clean(res.x)
+    return {
+        "Profit": _profit(res),
+        "Charge Schedule": x[:n].tolist(),
+        "Discharge Schedule": x[n:2 * n].tolist(),
+        "SOC Schedule": x[2 * n:].tolist(),
+    }
+
+
+# ======================================================
+# 2 MWh (BLOCKING) – MATRIX FORM
+# ======================================================
+@lru_cache(maxsize=None)
+def _matrices_2mwh_blocking(n):
+    """
+    Constraint matrix of the 2 MWh blocking model for n periods.
+
+    Variables are ordered [charge full, charge half, discharge full,
+    discharge half, SOC], n each.
+
+    Returns:
+        tuple: (constraints, bounds, integrality)
+    """
+    CF, CH, DF, DH, E = (k * n for k in range(5))
+    rows = _ConstraintRows()
+
+    for t in range(n):
+        # SOC dynamics
+        entries = [
+            (E + t, 1.0),
+            (CF + t, -2.0), (CH + t, -1.0),
+            (DF + t, 2.0), (DH + t, 1.0),
+        ]
+        if t > 0:
+            entries.append((E + t - 1, -1.0))
+        rows.add(entries, 0.0, 0.0)
+
+        # Only one operation per hour
+        rows.add([(CF + t, 1.0), (CH + t, 1.0), (DF + t, 1.0), (DH + t, 1.0)], -np.inf, 1.0)
+
+        # Blocking after full operation
+        if t < n - 1:
+            rows.add(
+                [
+                    (CF + t + 1, 1.0), (CH + t + 1, 1.0),
+                    (DF + t + 1, 1.0), (DH + t + 1, 1.0),
+                    (CF + t, 1.0), (DF + t, 1.0),
+                ],
+                -np.inf, 1.0,
+            )
+
+        # Discharge and charge limits
+        if t > 0:
+            rows.add([(DF + t, 1.0), (E + t - 1, -0.5)], -np.inf, 0.0)
+            rows.add([(DH + t, 1.0), (E + t - 1, -1.0)], -np.inf, 0.0)
+            rows.add([(CF + t, 1.0), (E + t - 1, 0.5)], -np.inf, 1.0)
+            rows.add([(CH + t, 1.0), (E + t - 1, 1.0)], -np.inf, 2.0)
+
+    constraints = rows.to_constraint(5 * n)
+
+    # Binary actions, SOC in [0, 2], empty at the start and end of the day
+    ub = np.ones(5 * n)
+    ub[E:] = 2.0
+    ub[E] = ub[E + n - 1] = 0.0
+    bounds = Bounds(np.zeros(5 * n), ub)
+
+    integrality = np.zeros(5 * n)
+    integrality[:E] = 1
+
+    return constraints, bounds, integrality
+
+
+def solve_highs_2mwh_blocking(prices, time_limit=None, mip_rel_gap=None):
+    """
+    Solve the 1 MW / 2 MWh full/half blocking MILP in-process with HiGHS.
+
+    Args:
+        prices (list): Prices for a single day (any number of periods).
+        time_limit (float): Time limit in seconds.
+        mip_rel_gap (float): Relative MIP gap at which to stop.
+
+    Returns:
+        dict: Optimal profit, schedules, and SOC profile. Profit is None
+            unless the solve is optimal.
+    """
+    with span("optimize.build", method="highs"):
+        p = np.asarray(prices, dtype=float)
+        n = len(p)
+        constraints, bounds, integrality = _matrices_2mwh_blocking(n)
+
+        # Maximize discharge revenue minus charge cost
+        c = np.concatenate([2 * p, p, -2 * p, -p, np.zeros(n)])
+
+    res = solve_milp(
+        c, constraints, bounds, integrality, milp_options(time_limit, mip_rel_gap)
+    )
+
+    keys = [
+        "Charge Full Schedule",
+        "Charge Half Schedule",
+        "Discharge Full Schedule",
+        "Discharge Half Schedule",
+    ]
+
+    if res.x is None:
+        return {"Profit": None, **{key: [None] * n for key in keys + ["SOC Schedule"]}}
+
+    x = _clean(res.x)
+    result = {"Profit": _profit(res)}
+    for k, key in enumerate(keys):
+        result[key] = x[k * n:(k + 1) * n].tolist()
+    result["SOC Schedule"] = x[4 * n:].tolist()
+    return result
@@ -0,0 +1,171 @@
+import numpy as np
+
+from src.instrumentation import span
+from src.optimization_dp import BATCH_DISPATCH
+
+
+def sample_residual_scenarios(forecast, residuals, n_scenarios=500, seed=0):
+    """
+    Price scenarios from a point forecast plus bootstrapped forecast errors.
+
+    Whole days of residuals are drawn, so the scenarios keep the
+    correlation of forecast errors between the hours of a day.
+
+    Args:
+        forecast (np.ndarray): (days x periods) point forecast.
+        residuals (np.ndarray): (m x periods) historical daily residuals
+            (actual minus forecast), e.g. of the training days.
+        n_scenarios (int): Scenarios per day.
+        seed (int): Seed of the bootstrap.
+
+    Returns:
+        np.ndarray: (days x n_scenarios x periods) price scenarios.
+    """
+    forecast = np.asarray(forecast, dtype=float)
+    residuals = np.asarray(residuals, dtype=float)
+    if residuals.ndim != 2 or residuals.shape[1] != forecast.shape[1]:
+        raise ValueError(
+            f"Expected residuals with {forecast.shape[1]} periods per row, "
+            f"got shape {residuals.shape}"
+        )
+
+    rng = np.random.default_rng(seed)
+    draws = rng.integers(0, len(residuals), size=(len(forecast), n_scenarios))
+    return forecast[:, None, :] + residuals[draws]
+
+
+def _weighted_quantile(values, weights, q):
+    """
+    Weighted q-quantile of every row: the smallest value whose cumulative
+    weight (rows sorted ascending) reaches q.
+
+    Args:
+        values (np.ndarray): (rows x n) values.
+        weights (np.ndarray): (rows x n) weights, summing to 1 per row.
+        q (float): Quantile in [0, 1].
+
+    Returns:
+        np.ndarray: (rows,) quantiles.
+    """
+    order = np.argsort(values, axis=1)
+    cumulative = np.cumsum(np.take_along_axis(weights, order, axis=1), axis=1)
+    # Tolerance for the rounding of the cumulative sum
+    index = (cumulative < q - 1e-12).sum(axis=1, keepdims=True)
+    index = np.minimum(index, values.shape[1] - 1)
+    return np.take_along_axis(np.take_along_axis(values, order, axis=1), index, axis=1)[:, 0]
+
+
+def _wait_and_see_profit(scenarios, solve, chunk_rows):
+    """
+    Optimal profit of every scenario, solved in vectorized row chunks.
+
+    Returns:
+        np.ndarray: (days x n_scenarios) profits.
+    """
+    days, n_scenarios, periods = scenarios.shape
+    flat = scenarios.reshape(-1, periods)
+    profit = np.empty(len(flat))
+    for start in range(0, len(flat), chunk_rows):
+        profit[start:start + chunk_rows] = solve(flat[start:start + chunk_rows])["Profit"]
+    return profit.reshape(days, n_scenarios)
+
+
+def optimize_stochastic(
+    scenarios,
+    model="1mwh",
+    point_forecast=None,
+    probabilities=None,
+    actual=None,
+    chunk_rows=100_000,
+):
+    """
+    Expected-profit schedule of each day over a set of price scenarios.
+
+    The schedule is non-anticipative: one schedule per day, fixed before
+    prices are known, that maximizes the probability-weighted profit over
+    the day's scenarios. The constraints do not depend on prices and the
+    profit of a fixed schedule is linear in them, so the expected profit of
+    a schedule is its profit at the expected prices; the stochastic program
+    is therefore solved exactly by the batched DP on the scenario mean, for
+    any number of scenarios. Scenario profits are evaluated in one matrix
+    product, and the per-scenario optima (wait-and-see) with the batched DP
+    over all scenarios at once.
+
+    Args:
+        scenarios (np.ndarray): (days x n_scenarios x periods) prices, or
+            (n_scenarios x periods) for a single day.
+        model (str): "1mwh" or "2mwh_blocking".
+        point_forecast (np.ndarray): Optional (days x periods) point
+            forecast; its schedule is the baseline of the VSS.
+        probabilities (np.ndarray): Optional scenario weights,
+            (n_scenarios,) or (days x n_scenarios); uniform by default.
+        actual (np.ndarray): Optional (days x periods) actual prices to
+            settle the schedules at.
+        chunk_rows (int): Scenarios per vectorized wait-and-see solve.
+
+    Returns:
+        dict: Per-day arrays:
+            - "schedule": result dict of the batched DP (schedules as
+              (days x periods) arrays)
+            - "net_discharge": (days x periods) MWh discharged per period
+            - "expected_profit", "profit_std", "profit_p05": expected
+              profit of the schedule over the scenarios, its standard
+              deviation and 5th percentile, all weighted by probabilities
+            - "wait_and_see_profit": expected optimum with perfect
+              knowledge of the scenario
+            - "evpi": wait_and_see_profit - expected_profit
+            - "point_expected_profit" and "vss" (expected_profit -
+              point_expected_profit), when point_forecast is given
+            - "realized_profit" (and "point_realized_profit"), when
+              actual is given
+    """
+    scenarios = np.asarray(scenarios, dtype=float)
+    if scenarios.ndim == 2:
+        scenarios = scenarios[None]
+    days, n_scenarios, periods = scenarios.shape
+
+    if probabilities is None:
+        weights = np.full((days, n_scenarios), 1.0 / n_scenarios)
+    else:
+        weights = np.broadcast_to(np.asarray(probabilities, dtype=float), (days, n_scenarios))
+        weights = weights / weights.sum(axis=1, keepdims=True)
+
+    solve, net_discharge = BATCH_DISPATCH[model]
+
+    with span("stochastic.here_and_now", days=days):
+        expected_prices = np.einsum("ds,dsp->dp", weights, scenarios)
+        schedule = solve(expected_prices)
+        net = net_discharge(schedule).astype(float)
+
+    with span("stochastic.evaluate", days=days, scenarios=n_scenarios):
+        scenario_profit = np.einsum("dsp,dp->ds", scenarios, net)
+        expected = (weights * scenario_profit).sum(axis=1)
+        std = np.sqrt((weights * (scenario_profit - expected[:, None]) ** 2).sum(axis=1))
+
+    with span("stochastic.wait_and_see", rows=days * n_scenarios):
+        wait_and_see = (weights * _wait_and_see_profit(scenarios, solve, chunk_rows)).sum(axis=1)
+
+    result = {
+        "schedule": schedule,
+        "net_discharge": net,
+        "expected_profit": expected,
+        "profit_std": std,
+        "profit_p05": _weighted_quantile(scenario_profit, weights, 0.05),
+        "wait_and_see_profit": wait_and_see,
+        "evpi": wait_and_see - expected,
+    }
+
+    point_net = None
+    if point_forecast is not None:
+        point_net = net_discharge(solve(np.asarray(point_forecast, dtype=float))).astype(float)
+        point_expected = (weights * np.einsum("dsp,dp->ds", scenarios, point_net)).sum(axis=1)
+        result["point_expected_profit"] = point_expected
+        result["vss"] = expected - point_expected
+
+    if actual is not None:
+        actual = np.asarray(actual, dtype=float)
+        result["realized_profit"] = (net * actual).sum(axis=1)
+        if point_net is not None:
+            result["point_realized_profit"] = (point_net * actual).sum(axis=1)
+
+    return result
@@ -0,0 +1,157 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.instrumentation import span
+from src.optimization_fleet import SIMULTANEOUS_MW, SPEC_DEFAULTS, solve_battery_lp
+
+
+# Swept spec columns, in grid order
+SWEEP_PARAMETERS = ("power_mw", "energy_mwh", "round_trip_efficiency", "max_cycles")
+
+
+def sweep_grid(
+    power_mw=(1.0,),
+    energy_mwh=(1.0,),
+    round_trip_efficiency=(1.0,),
+    max_cycles=(np.nan,),
+):
+    """
+    Full grid of battery specs.
+
+    The round-trip efficiency is split evenly into charge and discharge
+    efficiency (both its square root). max_cycles caps the energy
+    discharged per day at max_cycles * energy_mwh; NaN means no cap.
+
+    Returns:
+        pd.DataFrame: One row per grid point with the SWEEP_PARAMETERS
+            columns and a "spec" id.
+    """
+    grid = pd.DataFrame(
+        list(itertools.product(power_mw, energy_mwh, round_trip_efficiency, max_cycles)),
+        columns=list(SWEEP_PARAMETERS),
+    )
+    grid.insert(0, "spec", np.arange(len(grid)))
+    return grid
+
+
+# Prices shared by all tasks of a worker process
+_PRICES = None
+_PERIOD_HOURS = None
+
+
+def _init_worker(prices, period_hours):
+    global _PRICES, _PERIOD_HOURS
+    _PRICES = prices
+    _PERIOD_HOURS = period_hours
+
+
+def _check_throughput(result, power_mw, period_hours):
+    """
+    Raise if a schedule discharges more per day than fits in its periods
+    without charging, i.e. more than a battery that never charges and
+    discharges at the same time can deliver. Charge up to SIMULTANEOUS_MW
+    counts as solver noise, as in the fleet model.
+    """
+    periods = result["Charge"].shape[1]
+    throughput = period_hours * result["Discharge"].sum(axis=1)
+    limit = power_mw * period_hours * (result["Charge"] <= SIMULTANEOUS_MW).sum(axis=1)
+    excess = throughput > limit + SIMULTANEOUS_MW * period_hours * periods
+    if excess.any():
+        raise RuntimeError(
+            f"Schedule of {power_mw} MW discharges {throughput[excess].max():.3f} MWh "
+            f"in a day, more than the {limit[excess].min():.3f} MWh possible without "
+            f"charging and discharging at the same time"
+        )
+    return throughput
+
+
+def _solve_point(point):
+    """
+    Solve every day for one grid point.
+
+    Returns:
+        tuple: (daily profit, daily discharged energy in MWh) arrays.
+    """
+    efficiency = math.sqrt(point["round_trip_efficiency"])
+    spec = {
+        **SPEC_DEFAULTS,
+        "power_mw": point["power_mw"],
+        "energy_mwh": point["energy_mwh"],
+        "charge_efficiency": efficiency,
+        "discharge_efficiency": efficiency,
+        "max_cycles": point["max_cycles"],
+    }
+    with span("sweep.point", spec=point["spec"]):
+        result = solve_battery_lp(_PRICES, spec, _PERIOD_HOURS)
+    return result["Profit"], _check_throughput(result, point["power_mw"], _PERIOD_HOURS)
+
+
+def run_sweep(price_matrix, grid, dates=None, period_hours=None, workers=None, chunksize=4):
+    """
+    Evaluate a grid of battery specs on many days of prices.
+
+    Every grid point is the battery model of src.optimization_fleet over
+    all days at once (one block-diagonal problem per point, starting and
+    ending every day empty). Grid points run in parallel worker processes;
+    the price matrix is sent to each worker once, when the pool starts, and
+    shared by all of its grid points.
+
+    Args:
+        price_matrix (np.ndarray): (days x periods) prices.
+        grid (pd.DataFrame): Grid points, see sweep_grid.
+        dates (list): Date of each matrix row, default 0..days-1.
+        period_hours (float): Length of a period, default 24 / periods.
+        workers (int): Worker processes, default the CPU count; 1 runs
+            serially in the current process.
+        chunksize (int): Grid points sent to a worker at a time.
+
+    Returns:
+        pd.DataFrame: Tidy result cube with one row per grid point and
+            day: the grid columns, date, profit, throughput_mwh
+            (discharged energy) and cycles (throughput / energy).
+    """
+    prices = np.ascontiguousarray(price_matrix, dtype=float)
+    days, periods = prices.shape
+    period_hours = period_hours or 24 / periods
+    dates = np.arange(days) if dates is None else np.asarray(dates)
+
+    points = grid.to_dict("records")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(points)))
+    if workers == 1:
+        _init_worker(prices, period_hours)
+        solved = [_solve_point(point) for point in points]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(prices, period_hours),
+        ) as executor:
+            solved = list(executor.map(_solve_point, points, chunksize=chunksize))
+
+    cube = grid.loc[grid.index.repeat(days)].reset_index(drop=True)
+    cube["date"] = np.tile(dates, len(grid))
+    cube["profit"] = np.concatenate([profit for profit, _ in solved])
+    cube["throughput_mwh"] = np.concatenate([throughput for _, throughput in solved])
+    cube["cycles"] = cube["throughput_mwh"] / cube["energy_mwh"]
+    return cube
+
+
+def save_cube(cube, path):
+    """
+    Write a result cube as Parquet (path ending in .parquet, requires
+    pyarrow) or CSV.
+
+    Returns:
+        str: The path.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        cube.to_parquet(path, index=False)
+    else:
+        cube.to_csv(path, index=False)
+    return path
@@ -0,0 +1,334 @@
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import pickle
+import textwrap
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from src import instrumentation
+from src.ingestion import file_sha256
+
+
+class Stage:
+    """
+    One step of a Pipeline.
+
+    The stage function is called as func(inputs, **config), where inputs
+    maps the names of the upstream stages to their results. The result must
+    be picklable; it is stored as the stage artifact.
+    """
+
+    def __init__(self, name, func, deps=(), config=None, sources=(), outputs=()):
+        """
+        Args:
+            name (str): Unique stage name.
+            func (callable): Module-level stage function.
+            deps (list): Names of the stages whose results are needed.
+            config (dict): Keyword arguments of func (JSON serializable).
+            sources (list): Input files; their content is fingerprinted.
+            outputs (list): Files written by the stage; a missing file
+                forces a rerun.
+        """
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.config = config or {}
+        self.sources = list(sources)
+        self.outputs = list(outputs)
+
+
+def _src_imports(tree):
+    """
+    Names of the src modules imported anywhere in a syntax tree.
+    """
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            if node.module == "src":
+                modules.update(f"src.{alias.name}" for alias in node.names)
+            elif node.module.startswith("src."):
+                modules.add(node.module)
+        elif isinstance(node, ast.Import):
+            modules.update(alias.name for alias in node.names if alias.name.startswith("src."))
+    return modules
+
+
+def library_modules(func):
+    """
+    The src modules a stage function depends on.
+
+    Covers the modules it imports (also inside its body), the modules of
+    the global names it uses and, transitively, the src modules those
+    import.
+
+    Returns:
+        dict: Module name -> source file path.
+    """
+    pending = _src_imports(ast.parse(textwrap.dedent(inspect.getsource(func))))
+    for name in func.__code__.co_names:
+        value = func.__globals__.get(name)
+        module = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+        if isinstance(module, str) and module.startswith("src."):
+            pending.add(module)
+    if func.__module__.startswith("src."):
+        pending.add(func.__module__)
+
+    modules = {}
+    while pending:
+        module = pending.pop()
+        if module in modules:
+            continue
+        spec = importlib.util.find_spec(module)
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            continue
+        modules[module] = spec.origin
+        with open(spec.origin) as f:
+            pending |= _src_imports(ast.parse(f.read())) - set(modules)
+    return modules
+
+
+def _execute(func, name, config, dep_paths, artifact_path, trace=False):
+    """
+    Run one stage inside a worker process and store its result.
+
+    Returns:
+        tuple: (run time in seconds, spans recorded when trace is set)
+    """
+    if trace:
+        instrumentation.start_worker()
+
+    with instrumentation.span("pipeline.stage", stage=name):
+        inputs = {}
+        for dep, path in dep_paths.items():
+            with open(path, "rb") as f:
+                inputs[dep] = pickle.load(f)
+
+        start = time.perf_counter()
+        result = func(inputs, **config)
+        elapsed = time.perf_counter() - start
+
+        tmp_path = f"{artifact_path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, artifact_path)
+
+    return elapsed, instrumentation.drain() if trace else []
+
+
+class Pipeline:
+    """
+    DAG of cached stages.
+
+    Every stage is fingerprinted from its name, config, function source,
+    the src modules it uses (see library_modules), source file contents and
+    the fingerprints of its upstream stages. A stage whose artifact for the
+    current fingerprint exists (and whose output files exist) is skipped;
+    any upstream change changes the fingerprints downstream and reruns
+    exactly the affected stages. Stages whose dependencies are done run
+    concurrently in worker processes.
+
+    Example:
+        pipeline = Pipeline([
+            Stage("ingest", ingest, sources=["data/prices.csv"]),
+            Stage("train", train, deps=["ingest"], config={"rounds": 100}),
+        ])
+        pipeline.run()
+        model = pipeline.load("train")
+    """
+
+    def __init__(self, stages, artifact_dir=os.path.join(".cache", "pipeline")):
+        """
+        Args:
+            stages (list): Stage objects.
+            artifact_dir (str): Directory of the stage artifacts.
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name '{stage.name}'")
+            self.stages[stage.name] = stage
+
+        for stage in stages:
+            missing = [dep for dep in stage.deps if dep not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages {missing}")
+
+        self.order = self._topological_order()
+        self.artifact_dir = artifact_dir
+        self._fingerprints = {}
+        self._file_hashes = {}
+
+    def _topological_order(self):
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Cycle in pipeline at stage '{name}'")
+            state[name] = "visiting"
+            for dep in self.stages[name].deps:
+                visit(dep)
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def fingerprint(self, name):
+        """
+        Fingerprint of a stage, see the class docstring.
+        """
+        if name not in self._fingerprints:
+            stage = self.stages[name]
+            payload = {
+                "name": name,
+                "config": stage.config,
+                "code": inspect.getsource(stage.func),
+                "library": {
+                    module: self._file_hash(path)
+                    for module, path in library_modules(stage.func).items()
+                },
+                "sources": {path: self._file_hash(path) for path in stage.sources},
+                "deps": {dep: self.fingerprint(dep) for dep in stage.deps},
+            }
+            self._fingerprints[name] = hashlib.sha256(
+                json.dumps(payload, sort_keys=True, default=str).encode()
+            ).hexdigest()
+        return self._fingerprints[name]
+
+    def _file_hash(self, path):
+        if path not in self._file_hashes:
+            self._file_hashes[path] = file_sha256(path)
+        return self._file_hashes[path]
+
+    def artifact_path(self, name):
+        return os.path.join(self.artifact_dir, f"{name}-{self.fingerprint(name)[:16]}.pkl")
+
+    def _is_cached(self, name):
+        stage = self.stages[name]
+        return os.path.exists(self.artifact_path(name)) and all(
+            os.path.exists(path) for path in stage.outputs
+        )
+
+    def _required(self, targets):
+        if targets is None:
+            return set(self.stages)
+        required, stack = set(), list(targets)
+        while stack:
+            name = stack.pop()
+            if name not in required:
+                required.add(name)
+                stack.extend(self.stages[name].deps)
+        return required
+
+    def _remove_stale(self, name):
+        current = os.path.basename(self.artifact_path(name))
+        for file_name in os.listdir(self.artifact_dir):
+            if file_name.startswith(f"{name}-") and file_name.endswith(".pkl") and file_name != current:
+                os.remove(os.path.join(self.artifact_dir, file_name))
+
+    def run(self, targets=None, workers=None, force=False):
+        """
+        Run the stages needed for targets, skipping cached ones.
+
+        Args:
+            targets (list): Stage names to bring up to date, default all.
+            workers (int): Concurrent stages, default the CPU count.
+            force (bool or list): Rerun all (True) or the listed stages
+                and their downstream stages even if cached.
+
+        Returns:
+            list: One dict per stage with its name, status ("cached",
+                "ran", "failed" or "skipped" after an upstream failure),
+                run time in seconds and, for failures, the error. A failed
+                stage does not stop the stages that do not depend on it.
+        """
+        self._fingerprints = {}
+        self._file_hashes = {}
+        os.makedirs(self.artifact_dir, exist_ok=True)
+
+        required = self._required(targets)
+        forced = set(self.stages) if force is True else set(force or [])
+
+        pending = [name for name in self.order if name in required]
+        done, failed, report = set(), set(), []
+        running = {}
+
+        # Downstream of a rerun stage everything reruns as well
+        rerun = set()
+        for name in pending:
+            stage = self.stages[name]
+            if (
+                name in forced
+                or not self._is_cached(name)
+                or any(dep in rerun for dep in stage.deps)
+            ):
+                rerun.add(name)
+
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while pending or running:
+                for name in list(pending):
+                    deps = self.stages[name].deps
+                    if any(dep in failed for dep in deps):
+                        pending.remove(name)
+                        failed.add(name)
+                        report.append({"stage": name, "status": "skipped", "seconds": 0.0})
+                        continue
+                    if not all(dep in done for dep in deps):
+                        continue
+                    pending.remove(name)
+
+                    if name not in rerun:
+                        done.add(name)
+                        report.append({"stage": name, "status": "cached", "seconds": 0.0})
+                        continue
+
+                    stage = self.stages[name]
+                    future = executor.submit(
+                        _execute,
+                        stage.func,
+                        name,
+                        stage.config,
+                        {dep: self.artifact_path(dep) for dep in stage.deps},
+                        self.artifact_path(name),
+                        instrumentation.is_enabled(),
+                    )
+                    running[future] = name
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        elapsed, stage_events = future.result()
+                    except Exception as e:
+                        failed.add(name)
+                        report.append({
+                            "stage": name,
+                            "status": "failed",
+                            "seconds": 0.0,
+                            "error": f"{type(e).__name__}: {e}",
+                        })
+                        continue
+                    instrumentation.record(stage_events)
+                    self._remove_stale(name)
+                    done.add(name)
+                    report.append({"stage": name, "status": "ran", "seconds": elapsed})
+
+        return report
+
+    def load(self, name):
+        """
+        Load the current artifact of a stage.
+        """
+        with open(self.artifact_path(name), "rb") as f:
+            return pickle.load(f)
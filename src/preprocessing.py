@@ -1,50 +1,121 @@
+import numpy as np
 import pandas as pd
 
+from src.ingestion import read_price_data
+from src.instrumentation import traced
 
-def load_and_preprocess_data(file_path):
+
+def _read_price_csv(file_path):
     """
-    Load and preprocess an electricity price time series
-    for Q1 and Q2 (hourly resolution).
+    Read a price CSV through the shared binary cache, sorted by time.
+
+    Returns:
+        pd.DataFrame: Valid rows with a datetime64 'timestamp' column and a
+            float64 'price_eur_mwh' column.
+    """
+    data = read_price_data(file_path)
+    return data.sort_values("timestamp", kind="stable")
+
+
+@traced("preprocess.daily_matrix")
+def _daily_matrix(timestamps, prices, periods_per_day=None):
+    """
+    Reshape a sorted price series into a (days x periods) matrix.
+
+    Each price is placed by its day and its slot within the day, so only
+    complete days (every slot present) are kept.
+
+    Args:
+        timestamps (np.ndarray): Sorted datetime64[ns] timestamps.
+        prices (np.ndarray): Prices aligned with timestamps.
+        periods_per_day (int): Slots per day. Inferred from the median
+            time step when not given (24 hourly, 96 quarter-hourly).
+
+    Returns:
+        np.ndarray: C-contiguous float64 matrix, one complete day per row.
+        pd.Index: Date (datetime.date) of each row.
+    """
+    day_length = np.timedelta64(1, "D").astype("timedelta64[ns]")
+
+    if periods_per_day is None:
+        steps = np.diff(timestamps)
+        steps = steps[steps > np.timedelta64(0)]
+        if len(steps) == 0:
+            raise ValueError("Cannot infer the time resolution from fewer than two timestamps")
+        periods_per_day = int(round(day_length / np.median(steps)))
+
+    step = day_length // periods_per_day
+    days = timestamps.astype("datetime64[D]")
+    slots = (timestamps - days) // step
+
+    day_values, day_index = np.unique(days, return_inverse=True)
+    counts = np.bincount(day_index, minlength=len(day_values))
+
+    matrix = np.full((len(day_values), periods_per_day), np.nan)
+    matrix[day_index, slots] = prices
+
+    complete = (counts == periods_per_day) & ~np.isnan(matrix).any(axis=1)
+    dates = pd.Index(day_values[complete].astype(object), name="date")
+
+    return np.ascontiguousarray(matrix[complete]), dates
+
+
+@traced("preprocess.load_price_matrix")
+def load_price_matrix(file_path, periods_per_day=None):
+    """
+    Load a price CSV as a (days x periods) NumPy matrix.
+
+    Works for hourly and 15-minute data; days with missing or invalid
+    intervals are dropped.
 
     Expected CSV columns:
         - timestamp
         - price_eur_mwh
 
+    Args:
+        file_path (str): Path to the CSV file.
+        periods_per_day (int): Intervals per day. Inferred from the data
+            when not given.
+
     Returns:
-        pd.DataFrame : Hourly price time series
-        pd.Series    : Daily prices (exactly 24 values per day)
+        np.ndarray: Contiguous float64 matrix, one complete day per row
+        pd.Index    : Date of each row
     """
+    data = _read_price_csv(file_path)
+    return _daily_matrix(
+        data["timestamp"].to_numpy("datetime64[ns]"),
+        data["price_eur_mwh"].to_numpy("float64"),
+        periods_per_day,
+    )
 
-    # Load CSV
-    data = pd.read_csv(file_path)
-
-    # Validate required columns
-    required_columns = {"timestamp", "price_eur_mwh"}
-    if not required_columns.issubset(data.columns):
-        raise ValueError(
-            f"Input CSV must contain columns: {required_columns}"
-        )
 
-    # Convert timestamp and price
-    data["timestamp"] = pd.to_datetime(data["timestamp"], errors="coerce")
-    data["price_eur_mwh"] = pd.to_numeric(data["price_eur_mwh"], errors="coerce")
+@traced("preprocess.load_and_preprocess_data")
+def load_and_preprocess_data(file_path):
+    """
+    Load and preprocess an electricity price time series
+    for Q1 and Q2 (hourly resolution).
 
-    # Drop invalid rows
-    data = data.dropna(subset=["timestamp", "price_eur_mwh"])
+    Expected CSV columns:
+        - timestamp
+        - price_eur_mwh
 
-    # Sort by time
-    data = data.sort_values("timestamp")
+    Returns:
+        pd.DataFrame : Hourly price time series
+        pd.Series    : Daily prices (exactly 24 values per day), each entry
+                       a row view into the matrix of load_price_matrix
+    """
+    data = _read_price_csv(file_path)
 
     # Extract date
     data["date"] = data["timestamp"].dt.date
 
-    # Group prices by day
-    daily_prices = (
-        data.groupby("date")["price_eur_mwh"]
-        .apply(list)
+    # ✅ CRITICAL FIX: keep only full 24-hour days
+    matrix, dates = _daily_matrix(
+        data["timestamp"].to_numpy("datetime64[ns]"),
+        data["price_eur_mwh"].to_numpy("float64"),
+        periods_per_day=24,
     )
 
-    # ✅ CRITICAL FIX: keep only full 24-hour days
-    daily_prices = daily_prices[daily_prices.apply(len) == 24]
+    daily_prices = pd.Series(list(matrix), index=dates, name="price_eur_mwh")
 
-    return data, daily_prices
\ No newline at end of file
+    return data, daily_prices
@@ -1,10 +1,15 @@
-import pandas as pd
+from src.ingestion import read_price_data
+from src.instrumentation import traced
 
 
+@traced("preprocess.load_and_clean_data")
 def load_and_clean_data(file_path):
     """
     Load and clean electricity price data for exploratory analysis (EDA).
 
+    The CSV is parsed once into the shared binary cache (src.ingestion),
+    so repeated runs skip CSV parsing.
+
     Expected CSV columns:
         - timestamp
         - price_eur_mwh
@@ -14,31 +19,14 @@ def load_and_clean_data(file_path):
         with a single standardized column 'price'
     """
 
-    # Load CSV
-    data = pd.read_csv(file_path)
-
-    # ✅ Validate REAL CSV columns
-    required_columns = {"timestamp", "price_eur_mwh"}
-    if not required_columns.issubset(data.columns):
-        raise ValueError(
-            f"CSV must contain columns: {required_columns}"
-        )
-
-    # Convert timestamp
-    data["timestamp"] = pd.to_datetime(
-        data["timestamp"], errors="coerce"
-    )
-
-    # Convert price
-    data["price"] = pd.to_numeric(
-        data["price_eur_mwh"], errors="coerce"
-    )
+    # Load validated, typed data (invalid rows already dropped)
+    data = read_price_data(file_path)
 
-    # Drop invalid rows
-    data = data.dropna(subset=["timestamp", "price"])
+    # Standardize column name
+    data = data.rename(columns={"price_eur_mwh": "price"})
 
     # Set timestamp as index
     data = data.set_index("timestamp")
 
     # ✅ Return ONLY standardized column
-    return data[["price"]]
\ No newline at end of file
+    return data[["price"]]
@@ -0,0 +1,275 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.day_ahead import history_features
+from src.optimization import MODELS, BatteryModel
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class ForecastService:
+    """
+    Local forecast-and-dispatch service.
+
+    Keeps a trained day-ahead LightGBM booster and a battery optimizer in
+    memory. A request carries the recent price history up to gate closure;
+    the response holds the next-day forecast and the battery schedule
+    optimized on it.
+
+    The HTTP server runs on asyncio; feature building, prediction and the
+    solve run in a thread pool, so slow solves never block the event loop.
+    LightGBM prediction releases the GIL and CBC runs as a separate
+    process; the default "dp" method is pure Python and holds the GIL, but
+    takes well under a millisecond per day.
+
+    Endpoints:
+        POST /forecast   {"history": [...], "target_date": "YYYY-MM-DD"}
+        GET  /metrics    request count, errors and p50/p99 latency (ms)
+        GET  /health
+
+    Example:
+        service = ForecastService(booster, model="1mwh")
+        asyncio.run(service.serve("127.0.0.1", 8080))
+    """
+
+    def __init__(
+        self,
+        booster,
+        periods=24,
+        model="1mwh",
+        method="dp",
+        gate_closure_hour=12,
+        context_hours=24,
+        workers=None,
+        latency_window=10_000,
+    ):
+        """
+        Args:
+            booster (lgb.Booster): Model trained on src.day_ahead features.
+            periods (int): Periods per day.
+            model (str): Battery model, one of src.optimization.MODELS.
+            method (str): "dp", "highs" or "milp". With "milp" every worker
+                thread keeps its own pre-built BatteryModel.
+            gate_closure_hour (float): Gate closure used in training.
+            context_hours (float): Context length used in training.
+            workers (int): Worker threads, default the CPU count.
+            latency_window (int): Number of recent requests in the latency
+                percentiles.
+        """
+        if model not in MODELS:
+            raise ValueError(
+                f"Unknown model '{model}', expected one of: {sorted(MODELS)}"
+            )
+
+        self.booster = booster
+        self.periods = periods
+        self.model = model
+        self.method = method
+        self.gate_closure_hour = gate_closure_hour
+        self.context_hours = context_hours
+
+        self._executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self._local = threading.local()
+        self._latencies = deque(maxlen=latency_window)
+        self._requests = 0
+        self._errors = 0
+
+    def _optimize(self, prices):
+        if self.method != "milp":
+            return MODELS[self.model](prices, method=self.method)
+
+        # PuLP problems are not thread-safe: one template per worker thread
+        template = getattr(self._local, "template", None)
+        if template is None:
+            template = BatteryModel.build({"model": self.model, "periods": self.periods})
+            self._local.template = template
+        return template.solve(prices)
+
+    def parse_request(self, payload):
+        """
+        Validate the body of a /forecast request.
+
+        history must be a flat list of prices (null for missing ones) that
+        covers at least the context window before gate closure, and
+        target_date a date string.
+
+        Args:
+            payload (dict): Decoded JSON body.
+
+        Returns:
+            tuple: (history as a float array, target_date as pd.Timestamp).
+
+        Raises:
+            ValueError: If the request is malformed.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("body must be a JSON object")
+        missing = {"history", "target_date"} - set(payload)
+        if missing:
+            raise ValueError(f"missing fields: {sorted(missing)}")
+
+        history = payload["history"]
+        if not isinstance(history, list) or not all(
+            value is None
+            or (isinstance(value, (int, float)) and not isinstance(value, bool))
+            for value in history
+        ):
+            raise ValueError("history must be a list of numbers")
+        history = np.array(history, dtype=np.float64)
+        if np.isinf(history).any():
+            raise ValueError("history must not contain infinite prices")
+
+        context = int(round(self.context_hours * self.periods / 24))
+        if len(history) < context:
+            raise ValueError(
+                f"history must hold at least {context} prices "
+                f"(context_hours={self.context_hours}), got {len(history)}"
+            )
+
+        target_date = payload["target_date"]
+        if not isinstance(target_date, str):
+            raise ValueError("target_date must be a string 'YYYY-MM-DD'")
+        try:
+            parsed = pd.Timestamp(target_date)
+        except ValueError:
+            parsed = pd.NaT
+        if pd.isna(parsed):
+            raise ValueError(f"target_date '{target_date}' is not a valid date")
+
+        return history, parsed
+
+    def forecast_and_dispatch(self, history, target_date):
+        """
+        Forecast one day and optimize the battery on the forecast.
+
+        Args:
+            history (list): Prices up to gate closure on the previous day.
+            target_date (str): Day to forecast.
+
+        Returns:
+            dict: "forecast" plus the result dict of the battery model.
+        """
+        X = history_features(
+            history,
+            target_date,
+            self.periods,
+            self.gate_closure_hour,
+            self.context_hours,
+        )
+        # One thread per request: the batch is tiny and OpenMP start-up
+        # would dominate the latency
+        forecast = self.booster.predict(X, num_threads=1)
+        return {"forecast": forecast.tolist(), **self._optimize(forecast.tolist())}
+
+    def warm_up(self, history=None):
+        """
+        Run one request through the pipeline so the first client call does
+        not pay for lazy initialization.
+        """
+        if history is None:
+            history = np.zeros(8 * self.periods)
+        self.forecast_and_dispatch(history, "2000-01-01")
+
+    def metrics(self):
+        """
+        Request counters and latency percentiles in milliseconds.
+        """
+        latencies = np.array(self._latencies) * 1000.0
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (None, None)
+        return {
+            "requests": self._requests,
+            "errors": self._errors,
+            "latency_ms_p50": p50,
+            "latency_ms_p99": p99,
+        }
+
+    async def _route(self, method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics()
+        if method != "POST" or path != "/forecast":
+            return 404, {"error": f"No route for {method} {path}"}
+
+        start = time.perf_counter()
+        self._requests += 1
+        try:
+            history, target_date = self.parse_request(json.loads(body))
+        except ValueError as e:
+            self._errors += 1
+            return 400, {"error": f"Invalid request: {e}"}
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self._executor, self.forecast_and_dispatch, history, target_date
+            )
+        except Exception as e:
+            self._errors += 1
+            return 500, {"error": str(e)}
+
+        self._latencies.append(time.perf_counter() - start)
+        return 200, result
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = lines[0].split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self._route(method, path, body)
+                data = json.dumps(payload).encode()
+
+                keep_alive = (
+                    headers.get("connection", "").lower() != "close"
+                    and version == "HTTP/1.1"
+                )
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"\r\n".encode() + data
+                )
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """
+        Serve until cancelled.
+        """
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,283 @@
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+
+from src.modeling import (
+    DEFAULT_DATASET_DIR,
+    DEFAULT_PARAMS,
+    dataset_cache_path,
+    load_dataset_binary,
+)
+
+
+# Search space: name -> (kind, low, high) or ("choice", options)
+SEARCH_SPACE = {
+    "learning_rate": ("log", 0.01, 0.2),
+    "num_leaves": ("int", 8, 128),
+    "min_data_in_leaf": ("int", 5, 100),
+    "feature_fraction": ("float", 0.5, 1.0),
+    "bagging_fraction": ("float", 0.5, 1.0),
+    "bagging_freq": ("choice", [0, 1, 5]),
+    "lambda_l2": ("log", 1e-3, 10.0),
+}
+
+# Binning is shared by all trials, so it must not depend on min_data_in_leaf
+_DATASET_PARAMS = {"feature_pre_filter": False}
+
+
+class _TrialPruned(Exception):
+    pass
+
+
+def sample_params(search_space, rng):
+    """
+    Draw one parameter set from a search space.
+
+    Args:
+        search_space (dict): See SEARCH_SPACE.
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        dict: LightGBM parameters.
+    """
+    params = {}
+    for name, spec in search_space.items():
+        kind = spec[0]
+        if kind == "log":
+            params[name] = float(math.exp(rng.uniform(math.log(spec[1]), math.log(spec[2]))))
+        elif kind == "int":
+            params[name] = int(rng.integers(spec[1], spec[2] + 1))
+        elif kind == "float":
+            params[name] = float(rng.uniform(spec[1], spec[2]))
+        elif kind == "choice":
+            params[name] = spec[1][int(rng.integers(len(spec[1])))]
+        else:
+            raise ValueError(f"Unknown search space kind '{kind}' for '{name}'")
+    return params
+
+
+def time_series_folds(n_rows, n_folds=3, min_train_fraction=0.5):
+    """
+    Expanding-window CV folds: every fold trains on all rows before its
+    validation block, and the validation blocks tile the last
+    (1 - min_train_fraction) of the rows.
+
+    Returns:
+        list: (train_end, valid_end) row indices; fold k trains on
+            rows[:train_end] and validates on rows[train_end:valid_end].
+    """
+    start = int(n_rows * min_train_fraction)
+    edges = np.linspace(start, n_rows, n_folds + 1).astype(int)
+    return [(int(edges[k]), int(edges[k + 1])) for k in range(n_folds)]
+
+
+def _fold_datasets(X, y, folds, feature_config, dataset_dir):
+    """
+    Bin the train/validation data of every fold once and save it as binary
+    Datasets, which all trials load instead of re-binning. Existing files
+    are reused only when they hold the fold's labels.
+
+    Returns:
+        list: (train_path, valid_path) per fold.
+    """
+    os.makedirs(dataset_dir, exist_ok=True)
+    paths = []
+    for train_end, valid_end in folds:
+        train_path = dataset_cache_path(
+            {**feature_config, "validation_rows": valid_end - train_end},
+            X[:valid_end],
+            y[:valid_end],
+            _DATASET_PARAMS,
+            dataset_dir,
+        )
+        valid_path = f"{train_path[:-len('.bin')]}.valid.bin"
+
+        params = {**DEFAULT_PARAMS, **_DATASET_PARAMS}
+        cached = (
+            load_dataset_binary(train_path, y[:train_end], params) is not None
+            and load_dataset_binary(valid_path, y[train_end:valid_end], params) is not None
+        )
+        if not cached:
+            train = lgb.Dataset(X[:train_end], label=y[:train_end], params=params).construct()
+            valid = lgb.Dataset(
+                X[train_end:valid_end],
+                label=y[train_end:valid_end],
+                params=params,
+                reference=train,
+            ).construct()
+            for dataset, path in ((train, train_path), (valid, valid_path)):
+                tmp_path = f"{path}.tmp{os.getpid()}"
+                dataset.save_binary(tmp_path)
+                os.replace(tmp_path, path)
+
+        paths.append((train_path, valid_path))
+    return paths
+
+
+def _median_pruner(reports, lock, fold, n_startup_trials, n_warmup_steps, interval):
+    """
+    LightGBM callback that reports the validation RMSE every interval
+    rounds and prunes the trial when it is worse than the median of the
+    other trials at the same fold and round.
+    """
+    def callback(env):
+        step = env.iteration + 1
+        if step < n_warmup_steps or step % interval:
+            return
+
+        value = next(
+            result for name, metric, result, _ in env.evaluation_result_list
+            if name == "valid" and metric == "rmse"
+        )
+        key = (fold, step)
+        with lock:
+            others = reports.get(key, [])
+            reports[key] = others + [value]
+
+        if len(others) >= n_startup_trials and value > np.median(others):
+            raise _TrialPruned()
+
+    callback.order = 30
+    return callback
+
+
+def _run_trial(task):
+    """
+    Cross-validate one parameter set inside a worker process.
+    """
+    (trial, trial_params, paths, reports, lock,
+     n_startup_trials, n_warmup_steps, interval) = task
+    params = {**DEFAULT_PARAMS, **_DATASET_PARAMS, **trial_params}
+
+    scores, iterations = [], []
+    for fold, (train_path, valid_path) in enumerate(paths):
+        train = lgb.Dataset(train_path, params=params)
+        valid = lgb.Dataset(valid_path, params=params)
+        try:
+            booster = lgb.train(
+                params,
+                train,
+                valid_sets=[valid],
+                valid_names=["valid"],
+                num_boost_round=500,
+                callbacks=[
+                    lgb.early_stopping(stopping_rounds=50, verbose=False),
+                    _median_pruner(
+                        reports, lock, fold, n_startup_trials, n_warmup_steps, interval
+                    ),
+                ],
+            )
+        except _TrialPruned:
+            return {"trial": trial, "state": "pruned", "folds_done": fold,
+                    "cv_rmse": np.nan, "best_iteration": np.nan, **trial_params}
+
+        scores.append(booster.best_score["valid"]["rmse"])
+        iterations.append(booster.best_iteration)
+
+    return {
+        "trial": trial,
+        "state": "complete",
+        "folds_done": len(paths),
+        "cv_rmse": float(np.mean(scores)),
+        "best_iteration": int(np.mean(iterations)),
+        **trial_params,
+    }
+
+
+def tune_lightgbm(
+    X,
+    y,
+    feature_config,
+    n_trials=40,
+    n_folds=3,
+    search_space=None,
+    seed=0,
+    workers=None,
+    n_startup_trials=5,
+    n_warmup_steps=50,
+    interval=10,
+    dataset_dir=DEFAULT_DATASET_DIR,
+):
+    """
+    Parallel random search over LightGBM parameters with median pruning.
+
+    Every trial is scored by its mean validation RMSE over expanding-window
+    time-series folds. Trials run in worker processes and report their
+    validation RMSE every interval rounds to a shared store; a trial is
+    stopped once it is worse than the median of at least n_startup_trials
+    other trials at the same fold and round. The folds are binned once and
+    loaded from binary Datasets by every trial.
+
+    Args:
+        X (np.ndarray): Features, in time order (training data only).
+        y (array-like): Targets.
+        feature_config (dict): Feature settings, part of the Dataset key.
+        n_trials (int): Number of parameter sets.
+        n_folds (int): Number of CV folds.
+        search_space (dict): See SEARCH_SPACE (the default).
+        seed (int): Seed of the parameter sampler.
+        workers (int): Worker processes, default the CPU count.
+        n_startup_trials (int): Reports needed before pruning at a round.
+        n_warmup_steps (int): Rounds before pruning starts.
+        interval (int): Rounds between reports.
+        dataset_dir (str): Binary Dataset cache directory.
+
+    Returns:
+        pd.DataFrame: One row per trial, best first.
+    """
+    y = np.asarray(y, dtype=np.float64)
+
+    folds = time_series_folds(len(y), n_folds)
+    paths = _fold_datasets(X, y, folds, feature_config, dataset_dir)
+
+    rng = np.random.default_rng(seed)
+    trial_params = [sample_params(search_space or SEARCH_SPACE, rng) for _ in range(n_trials)]
+
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(workers or cpu_count, n_trials))
+    threads = max(1, cpu_count // workers)
+
+    with Manager() as manager:
+        reports, lock = manager.dict(), manager.Lock()
+        tasks = [
+            (trial, {**params, "num_threads": threads, "seed": seed}, paths, reports,
+             lock, n_startup_trials, n_warmup_steps, interval)
+            for trial, params in enumerate(trial_params)
+        ]
+        if workers == 1:
+            rows = [_run_trial(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                rows = list(executor.map(_run_trial, tasks))
+
+    trials = pd.DataFrame(rows).drop(columns=["num_threads"])
+    return trials.sort_values("cv_rmse", na_position="last").reset_index(drop=True)
+
+
+def save_best_params(trials, path):
+    """
+    Write the best completed trial of tune_lightgbm as JSON, in the format
+    read by src.modeling.load_params.
+    """
+    best = trials[trials["state"] == "complete"].iloc[0]
+    params = {
+        name: best[name].item() if hasattr(best[name], "item") else best[name]
+        for name in trials.columns
+        if name not in ("trial", "state", "folds_done", "cv_rmse", "best_iteration")
+    }
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "params": params,
+            "cv_rmse": float(best["cv_rmse"]),
+            "best_iteration": int(best["best_iteration"]),
+        }, f, indent=2)
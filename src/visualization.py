@@ -5,10 +5,13 @@ import pandas as pd
 import numpy as np
 from sklearn.metrics import mean_squared_error
 
+from src.instrumentation import traced
+
 
 # ======================================================
 # MILP – DAILY PROFITS
 # ======================================================
+@traced("plot.plot_daily_profits")
 def plot_daily_profits(results_df, output_folder):
     """
     Plot daily optimization profits.
@@ -33,6 +36,7 @@ def plot_daily_profits(results_df, output_folder):
 # ======================================================
 # MILP – 1 MWh STRATEGY
 # ======================================================
+@traced("plot.plot_strategy_1mwh")
 def plot_strategy_1mwh(day_index, results, daily_prices, output_folder):
     """
     Plot charging/discharging strategy for 1 MWh battery.
@@ -81,6 +85,7 @@ def plot_strategy_1mwh(day_index, results, daily_prices, output_folder):
 # ======================================================
 # MILP – 2 MWh STRATEGY (BLOCKING)
 # ======================================================
+@traced("plot.plot_strategy_2mwh_blocking")
 def plot_strategy_2mwh_blocking(day_index, results, daily_prices, output_folder):
     """
     Plot charging/discharging strategy for 2 MWh battery
@@ -156,6 +161,7 @@ def plot_strategy_2mwh_blocking(day_index, results, daily_prices, output_folder)
 # ======================================================
 # ML – FORECAST VS ACTUAL
 # ======================================================
+@traced("plot.plot_actual_vs_predicted")
 def plot_actual_vs_predicted(test_data, y_true, y_pred, output_folder):
     """
     Plot actual vs predicted prices.
@@ -180,6 +186,7 @@ def plot_actual_vs_predicted(test_data, y_true, y_pred, output_folder):
 # ======================================================
 # ML + MILP – FORECAST-BASED STRATEGY
 # ======================================================
+@traced("plot.plot_strategy_forecast")
 def plot_strategy_forecast(day_index, results, test_data, output_folder):
     """
     Plot battery strategy based on forecasted prices.
@@ -228,6 +235,7 @@ def plot_strategy_forecast(day_index, results, test_data, output_folder):
 # ======================================================
 # EDA – PRICE ANALYSIS
 # ======================================================
+@traced("plot.plot_line_chart")
 def plot_line_chart(price_15min, price_60min, data_15min, data_60min, output_folder):
     plt.figure(figsize=(12, 6))
     plt.plot(data_15min.index, price_15min, label="15-min")
@@ -239,6 +247,7 @@ def plot_line_chart(price_15min, price_60min, data_15min, data_60min, output_fol
     plt.show()
 
 
+@traced("plot.plot_box_plot")
 def plot_box_plot(price_15min, price_60min, output_folder):
     plt.figure(figsize=(8, 5))
     plt.boxplot([price_15min, price_60min], labels=["15-min", "Hourly"])
@@ -248,6 +257,7 @@ def plot_box_plot(price_15min, price_60min, output_folder):
     plt.show()
 
 
+@traced("plot.plot_histogram")
 def plot_histogram(price_15min, price_60min, output_folder):
     plt.figure(figsize=(10, 6))
     sns.histplot(price_15min, bins=50, kde=True, label="15-min", alpha=0.6)
@@ -258,6 +268,7 @@ def plot_histogram(price_15min, price_60min, output_folder):
     plt.show()
 
 
+@traced("plot.plot_line_chart_single")
 def plot_line_chart_single(prices, output_folder):
     plt.figure(figsize=(12, 6))
     plt.plot(prices.index, prices.values, label="Price")
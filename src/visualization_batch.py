@@ -0,0 +1,249 @@
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from src.instrumentation import traced
+
+
+# Chart layout per strategy kind: title, file name, price label, whether SOC
+# is drawn, and (result key, color, marker size, label) of every marker class
+STRATEGY_KINDS = {
+    "1mwh": {
+        "title": "Optimal Battery Strategy (1 MWh) – {date}",
+        "file": "strategy_1mwh_{date}.png",
+        "price_label": "Price",
+        "soc": True,
+        "markers": [
+            ("Charge Schedule", "green", 100, "Charge"),
+            ("Discharge Schedule", "red", 100, "Discharge"),
+        ],
+    },
+    "2mwh_blocking": {
+        "title": "Optimal Charging/Discharging Strategy (2 MWh) – {date}",
+        "file": "strategy_2mwh_{date}.png",
+        "price_label": "Hourly Prices (EUR/MWh)",
+        "soc": True,
+        "markers": [
+            ("Charge Full Schedule", "green", 120, "Full Charge"),
+            ("Charge Half Schedule", "lightgreen", 120, "Half Charge"),
+            ("Discharge Full Schedule", "red", 120, "Full Discharge"),
+            ("Discharge Half Schedule", "pink", 120, "Half Discharge"),
+        ],
+    },
+    "forecast": {
+        "title": "Forecast-based Strategy – {date}",
+        "file": "forecast_strategy_{date}.png",
+        "price_label": "Forecasted Price",
+        "soc": False,
+        "markers": [
+            ("Charge Schedule", "green", 100, "Charge"),
+            ("Discharge Schedule", "red", 100, "Discharge"),
+        ],
+    },
+}
+
+
+class _StrategyFigure:
+    """
+    One Agg figure whose artists are created once and updated per day.
+
+    Uses the object-oriented API only (no pyplot global state), so figures
+    can be rendered headless in any process.
+    """
+
+    def __init__(self, kind, periods):
+        self.spec = STRATEGY_KINDS[kind]
+        self.periods = periods
+        self.hours = np.arange(periods)
+
+        self.figure = Figure(figsize=(14, 7))
+        FigureCanvasAgg(self.figure)
+        self.ax = self.figure.add_subplot()
+
+        empty = np.full(periods, np.nan)
+        (self.price_line,) = self.ax.plot(self.hours, empty, label=self.spec["price_label"])
+        self.soc_line = None
+        if self.spec["soc"]:
+            (self.soc_line,) = self.ax.step(self.hours, empty, label="SOC", where="mid")
+
+        self.markers = [
+            (key, self.ax.scatter([], [], color=color, s=size, label=label, zorder=5))
+            for key, color, size, label in self.spec["markers"]
+        ]
+
+        self.ax.set_xlim(-0.5, periods - 0.5)
+        self.ax.set_xlabel("Hour" if periods == 24 else "Period")
+        self.ax.set_ylabel("Price / SOC" if self.soc_line else "Price")
+        self.ax.legend(loc="upper left")
+        self.ax.grid(True)
+
+        # Lay out once, with a title of final length in place
+        self.ax.set_title(self.spec["title"].format(date="0000-00-00"))
+        self.figure.tight_layout()
+
+    def render(self, date, prices, result, path):
+        prices = np.asarray(prices, dtype=float)
+        self.price_line.set_ydata(prices)
+
+        low, high = prices.min(), prices.max()
+        if self.soc_line is not None:
+            soc = np.asarray(result["SOC Schedule"], dtype=float)
+            self.soc_line.set_ydata(soc)
+            low, high = min(low, soc.min()), max(high, soc.max())
+
+        for key, collection in self.markers:
+            active = np.asarray(result[key], dtype=float) == 1
+            collection.set_offsets(np.column_stack([self.hours[active], prices[active]]))
+
+        margin = 0.05 * (high - low or 1.0)
+        self.ax.set_ylim(low - margin, high + margin)
+        self.ax.set_title(self.spec["title"].format(date=date))
+        self.figure.savefig(path)
+
+
+# One reusable figure per worker process
+_FIGURE = None
+
+
+def _init_worker(kind, periods):
+    global _FIGURE
+    _FIGURE = _StrategyFigure(kind, periods)
+
+
+def _render_chunk(chunk):
+    for date, prices, result, path in chunk:
+        _FIGURE.render(date, prices, result, path)
+
+
+def select_days(results, select="all"):
+    """
+    Choose which days of a backtest to plot.
+
+    Args:
+        results (list): Result dicts with "date" and "Profit".
+        select: "all" (backtest order), ("top", n) for the n most
+            profitable days or ("worst", n) for the n least profitable.
+
+    Returns:
+        list: Selected result dicts.
+    """
+    if select == "all":
+        return list(results)
+
+    mode, n = select
+    if mode not in ("top", "worst"):
+        raise ValueError(f"Unknown selection '{mode}', expected 'top' or 'worst'")
+    ranked = sorted(results, key=lambda r: r["Profit"], reverse=(mode == "top"))
+    return ranked[:n]
+
+
+def _write_index(output_folder, kind, rows):
+    """
+    Write an index.html listing every rendered day with its profit.
+    """
+    lines = [
+        "<!DOCTYPE html>",
+        "<html><head><meta charset='utf-8'>",
+        f"<title>Battery strategies ({html.escape(kind)})</title>",
+        "<style>body{font-family:sans-serif} td{padding:4px 12px}"
+        " img{width:420px}</style>",
+        "</head><body>",
+        f"<h1>Battery strategies ({html.escape(kind)})</h1>",
+        "<table><tr><th>Date</th><th>Profit (EUR)</th><th>Chart</th></tr>",
+    ]
+    for date, profit, file_name in rows:
+        link = html.escape(file_name)
+        lines.append(
+            f"<tr><td>{html.escape(str(date))}</td><td>{profit:.2f}</td>"
+            f"<td><a href='{link}'><img src='{link}' loading='lazy'></a></td></tr>"
+        )
+    lines += ["</table>", "</body></html>"]
+
+    path = os.path.join(output_folder, "index.html")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return path
+
+
+@traced("plot.plot_strategies")
+def plot_strategies(
+    results,
+    daily_prices,
+    output_folder,
+    kind="1mwh",
+    select="all",
+    workers=None,
+    chunksize=16,
+):
+    """
+    Render strategy charts for many days and an index page.
+
+    Each worker process builds one figure with the Agg backend and only
+    updates its data per day, so rendering a day is a savefig of an
+    existing figure instead of building a new one. Charts have the same
+    file names as the single-day plot_strategy_* functions.
+
+    Args:
+        results (list): Result dicts of optimize_days (with "date").
+        daily_prices: Mapping date -> price vector (e.g. the daily_prices
+            Series, or forecast prices for kind="forecast").
+        output_folder (str): Target folder.
+        kind (str): "1mwh", "2mwh_blocking" or "forecast".
+        select: Days to plot, see select_days.
+        workers (int): Worker processes, default the CPU count.
+        chunksize (int): Days per task.
+
+    Returns:
+        str: Path of the index.html.
+    """
+    if kind not in STRATEGY_KINDS:
+        raise ValueError(
+            f"Unknown kind '{kind}', expected one of: {sorted(STRATEGY_KINDS)}"
+        )
+    os.makedirs(output_folder, exist_ok=True)
+
+    selected = select_days(results, select)
+    file_pattern = STRATEGY_KINDS[kind]["file"]
+    keys = ["SOC Schedule"] * STRATEGY_KINDS[kind]["soc"] + [
+        key for key, *_ in STRATEGY_KINDS[kind]["markers"]
+    ]
+
+    tasks = [
+        (
+            result["date"],
+            np.asarray(daily_prices[result["date"]], dtype=float),
+            {key: result[key] for key in keys},
+            os.path.join(output_folder, file_pattern.format(date=result["date"])),
+        )
+        for result in selected
+    ]
+
+    if tasks:
+        periods = len(tasks[0][1])
+        chunks = [tasks[i:i + chunksize] for i in range(0, len(tasks), chunksize)]
+        workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+
+        if workers == 1:
+            _init_worker(kind, periods)
+            for chunk in chunks:
+                _render_chunk(chunk)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(kind, periods),
+            ) as executor:
+                list(executor.map(_render_chunk, chunks))
+
+    return _write_index(
+        output_folder,
+        kind,
+        [
+            (date, result["Profit"], os.path.basename(path))
+            for (date, _, _, path), result in zip(tasks, selected)
+        ],
+    )
@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.feature_engineering import (
+    OnlineFeatureState,
+    build_feature_matrix,
+    create_lag_features,
+    create_rolling_features,
+    feature_names,
+)
+from src.preprocessing_ml import load_and_preprocess_data
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+CONFIGS = [(24, 24), (48, 12), (3, 168)]
+
+
+@pytest.fixture(scope="module", params=["synthetic_prices_60min.csv", "synthetic_prices_15min.csv"])
+def prices(request):
+    data = load_and_preprocess_data(os.path.join(DATA_DIR, request.param))
+    return data.sort_values("timestamp")["price"].to_numpy()
+
+
+def batch_features(prices, lag_hours, rolling_window):
+    """
+    Feature columns of the DataFrame builders.
+    """
+    df = pd.DataFrame({"price": prices})
+    df = create_lag_features(df, lag_hours)
+    df = create_rolling_features(df, rolling_window)
+    return df[feature_names(lag_hours, rolling_window)].to_numpy()
+
+
+@pytest.mark.parametrize("lag_hours, rolling_window", CONFIGS)
+def test_build_feature_matrix_equals_dataframe_builders(prices, lag_hours, rolling_window):
+    expected = batch_features(prices, lag_hours, rolling_window)
+    X, valid = build_feature_matrix(prices, lag_hours, rolling_window)
+
+    np.testing.assert_array_equal(X, expected)
+    np.testing.assert_array_equal(valid, ~np.isnan(expected).any(axis=1))
+
+
+@pytest.mark.parametrize("lag_hours, rolling_window", CONFIGS)
+def test_online_state_matches_dataframe_builders(prices, lag_hours, rolling_window):
+    expected = batch_features(prices, lag_hours, rolling_window)
+    state = OnlineFeatureState(lag_hours, rolling_window)
+
+    ready_rows = 0
+    for t, price in enumerate(prices):
+        features = state.update(price)
+        if state.is_ready:
+            ready_rows += 1
+            np.testing.assert_allclose(features, expected[t], rtol=1e-9, atol=1e-9)
+
+    assert ready_rows == (~np.isnan(expected).any(axis=1)).sum()
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from src.ingestion import parse_price_csv, read_price_data
+from src.preprocessing import load_price_matrix
+
+
+def write_csv(path, timestamps, prices):
+    pd.DataFrame({"timestamp": timestamps, "price_eur_mwh": prices}).to_csv(path, index=False)
+    return str(path)
+
+
+def test_offset_timestamps_keep_local_days(tmp_path):
+    local = pd.date_range("2024-01-01", periods=48, freq="h")
+    path = write_csv(
+        tmp_path / "prices.csv",
+        local.strftime("%Y-%m-%dT%H:%M:%S+01:00"),
+        np.arange(48.0),
+    )
+
+    data = parse_price_csv(path)
+    np.testing.assert_array_equal(data["timestamp"].to_numpy(), local.to_numpy())
+
+    matrix, dates = load_price_matrix(path)
+    assert matrix.shape == (2, 24)
+    np.testing.assert_array_equal(matrix.ravel(), np.arange(48.0))
+
+
+def test_mixed_offsets_across_dst(tmp_path):
+    path = write_csv(
+        tmp_path / "prices.csv",
+        ["2024-03-31 01:00+01:00", "2024-03-31 03:00+02:00", "2024-01-01 00:00Z",
+         "2024-01-01 05:00-0500", "2024-01-01 06:00"],
+        [1.0, 2.0, 3.0, 4.0, 5.0],
+    )
+
+    data = read_price_data(path, cache_dir=str(tmp_path / "cache"))
+
+    expected = pd.to_datetime([
+        "2024-03-31 01:00", "2024-03-31 03:00", "2024-01-01 00:00",
+        "2024-01-01 05:00", "2024-01-01 06:00",
+    ])
+    np.testing.assert_array_equal(data["timestamp"].to_numpy(), expected.to_numpy())
@@ -0,0 +1,50 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.optimization import optimize_days
+from src.optimization_dp import solve_dp_batch_1mwh, solve_dp_batch_2mwh_blocking
+from src.preprocessing import load_and_preprocess_data
+
+
+DATA_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "synthetic_prices_60min.csv"
+)
+
+BATCH_SOLVERS = {
+    "1mwh": solve_dp_batch_1mwh,
+    "2mwh_blocking": solve_dp_batch_2mwh_blocking,
+}
+
+
+@pytest.fixture(scope="module")
+def daily_prices():
+    _, daily_prices = load_and_preprocess_data(DATA_PATH)
+    return daily_prices
+
+
+@pytest.fixture(scope="module", params=sorted(BATCH_SOLVERS))
+def cbc_profits(request, daily_prices):
+    """
+    CBC profit of every synthetic day, solved once per model.
+    """
+    results = optimize_days(dict(daily_prices.items()), model=request.param, workers=1)
+    assert all("Error" not in result for result in results)
+    return request.param, [result["Profit"] for result in results]
+
+
+def test_dp_matches_cbc_on_synthetic_data(daily_prices, cbc_profits):
+    model, expected = cbc_profits
+    results = optimize_days(dict(daily_prices.items()), model=model, workers=1, method="dp")
+
+    np.testing.assert_allclose(
+        [result["Profit"] for result in results], expected, rtol=0, atol=1e-9
+    )
+
+
+def test_batch_dp_matches_cbc_on_synthetic_data(daily_prices, cbc_profits):
+    model, expected = cbc_profits
+    batch = BATCH_SOLVERS[model](np.vstack(daily_prices.to_list()))
+
+    np.testing.assert_allclose(batch["Profit"], expected, rtol=0, atol=1e-9)
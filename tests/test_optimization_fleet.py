@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint
+
+from src.optimization_fleet import (
+    SIMULTANEOUS_MW,
+    SPEC_DEFAULTS,
+    _asset_block,
+    optimize_fleet,
+    solve_battery_lp,
+)
+from src.optimization_highs import milp_options, solve_milp
+from src.optimization_sweep import _check_throughput, run_sweep, sweep_grid
+
+
+LOSSY = {"charge_efficiency": 0.9, "discharge_efficiency": 0.9}
+
+
+def full_milp_profit(prices, spec):
+    """
+    Daily profit of the battery model with a binary mode in every period.
+    """
+    days, periods = prices.shape
+    n = days * periods
+    spec = {**SPEC_DEFAULTS, "power_mw": 1.0, "energy_mwh": 1.0, **spec}
+    A, lower, upper, var_lower, var_upper = _asset_block(
+        spec, days, periods, 24 / periods, np.ones(n, dtype=bool)
+    )
+    h = 24 / periods
+    c = np.concatenate([h * prices.ravel(), -h * prices.ravel(), np.zeros(2 * n)])
+    res = solve_milp(
+        c,
+        LinearConstraint(sparse.csr_array(A), lower, upper),
+        Bounds(var_lower, var_upper),
+        np.concatenate([np.zeros(3 * n), np.ones(n)]),
+        milp_options(),
+    )
+    return -(c * res.x).reshape(4, days, periods).sum(axis=(0, 2))
+
+
+def test_no_simultaneous_charge_and_discharge_at_negative_prices():
+    result = solve_battery_lp(np.full((1, 24), -50.0), LOSSY)
+
+    assert not (np.minimum(result["Charge"], result["Discharge"]) > 0).any()
+    # 12 full charges at -50, each discharged as 0.81 MWh
+    assert result["Profit"][0] == pytest.approx(12 * 50 * (1 - 0.81))
+
+
+@pytest.mark.parametrize("spec", [LOSSY, {}, {**LOSSY, "max_cycles": 1.0, "power_mw": 0.5}])
+def test_matches_milp_with_all_modes_binary(spec):
+    rng = np.random.default_rng(0)
+    prices = rng.normal(10, 40, size=(5, 24))
+
+    result = solve_battery_lp(prices, spec)
+
+    assert not (np.minimum(result["Charge"], result["Discharge"]) > 0).any()
+    np.testing.assert_allclose(result["Profit"], full_milp_profit(prices, spec), atol=1e-6)
+
+
+def test_grouped_assets_never_charge_and_discharge_at_once():
+    rng = np.random.default_rng(1)
+    prices = {"a": rng.normal(20, 40, size=(3, 24)), "b": rng.normal(20, 40, size=(3, 24))}
+    specs = pd.DataFrame({
+        "asset": ["x", "y"],
+        "node": ["a", "b"],
+        "power_mw": [1.0, 2.0],
+        "energy_mwh": [2.0, 2.0],
+        "charge_efficiency": [0.9, 0.95],
+        "discharge_efficiency": [0.9, 0.95],
+        "group": ["site", "site"],
+    })
+
+    table = optimize_fleet(specs, prices, grid_limits={"site": 1.5}, workers=1)
+
+    assert (table["status"].str.startswith("Optimization terminated")).all()
+    assert not (np.minimum(table["charge_mw"], table["discharge_mw"]) > 0).any()
+    net = table.groupby(["date", "period"])[["discharge_mw", "charge_mw"]].sum()
+    assert ((net["discharge_mw"] - net["charge_mw"]).abs() <= 1.5 + 1e-6).all()
+
+
+def test_sweep_throughput_fits_exclusive_schedules():
+    rng = np.random.default_rng(2)
+    prices = np.vstack([np.full(24, -50.0), rng.normal(10, 40, size=(3, 24))])
+    grid = sweep_grid([0.5, 1.0], [1.0, 2.0], [0.81, 1.0])
+
+    # run_sweep raises when a day's throughput needs simultaneous charging
+    cube = run_sweep(prices, grid, workers=1)
+
+    point = cube[
+        (cube["date"] == 0)
+        & (cube["power_mw"] == 1.0)
+        & (cube["energy_mwh"] == 1.0)
+        & (cube["round_trip_efficiency"] == 0.81)
+    ]
+    assert point["profit"].item() == pytest.approx(12 * 50 * (1 - 0.81))
+    assert point["throughput_mwh"].item() == pytest.approx(12 * 0.81)
+
+
+def test_throughput_check_rejects_simultaneous_schedules():
+    ones = np.ones((1, 24))
+    with pytest.raises(RuntimeError):
+        _check_throughput({"Charge": ones, "Discharge": ones}, 1.0, 1.0)
+
+
+def test_throughput_check_ignores_solver_noise():
+    charge = np.zeros((1, 24))
+    charge[0, :12] = 1.0
+    charge[0, 12:] = 0.5 * SIMULTANEOUS_MW
+    discharge = np.zeros((1, 24))
+    discharge[0, 12:] = 1.0
+
+    throughput = _check_throughput({"Charge": charge, "Discharge": discharge}, 1.0, 1.0)
+
+    assert throughput[0] == pytest.approx(12.0)
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+from scipy.optimize import OptimizeResult
+
+from src import optimization_highs
+from src.optimization_cache import SolveCache
+from src.optimization_highs import solve_highs_1mwh, solve_highs_2mwh_blocking
+
+
+PRICES = np.random.default_rng(0).normal(50, 20, 24).tolist()
+
+
+@pytest.mark.parametrize("solve", [solve_highs_1mwh, solve_highs_2mwh_blocking])
+def test_time_limited_incumbent_has_no_profit(solve, monkeypatch):
+    solve_milp = optimization_highs.solve_milp
+
+    def stopped(*args):
+        res = solve_milp(*args)
+        return OptimizeResult(x=res.x, fun=res.fun, status=1, message="Time limit reached")
+
+    monkeypatch.setattr(optimization_highs, "solve_milp", stopped)
+    result = solve(PRICES, time_limit=1.0)
+
+    assert result["Profit"] is None
+    assert result["SOC Schedule"][0] is not None
+    assert not SolveCache.is_cacheable(result)
+
+
+@pytest.mark.parametrize("solve", [solve_highs_1mwh, solve_highs_2mwh_blocking])
+def test_optimal_solve_has_profit(solve):
+    result = solve(PRICES)
+
+    assert result["Profit"] is not None
+    assert SolveCache.is_cacheable(result)
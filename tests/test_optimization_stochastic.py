@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from src.optimization_stochastic import optimize_stochastic
+
+
+@pytest.mark.parametrize("model", ["1mwh", "2mwh_blocking"])
+def test_weights_equal_repeated_scenarios(model):
+    rng = np.random.default_rng(0)
+    scenarios = rng.normal(50, 25, size=(3, 6, 24))
+    counts = np.array([1, 1, 2, 5, 11, 80])
+
+    weighted = optimize_stochastic(scenarios, model, probabilities=counts / counts.sum())
+    repeated = optimize_stochastic(np.repeat(scenarios, counts, axis=1), model)
+
+    for key in ("expected_profit", "profit_std", "profit_p05", "wait_and_see_profit"):
+        np.testing.assert_allclose(weighted[key], repeated[key], rtol=1e-12, err_msg=key)
+
+
+def test_p05_follows_probabilities():
+    # One day, three scenarios with the same price shape at 1x, 2x and 3x,
+    # so the schedule's profit grows with the scenario
+    prices = np.tile(np.linspace(0, 100, 24), (3, 1)) * np.array([[1.0], [2.0], [3.0]])
+
+    uniform = optimize_stochastic(prices)
+    skewed = optimize_stochastic(prices, probabilities=[0.01, 0.01, 0.98])
+
+    profits = np.einsum("sp,p->s", prices, skewed["net_discharge"][0])
+    assert uniform["profit_p05"][0] == pytest.approx(profits.min())
+    assert skewed["profit_p05"][0] == pytest.approx(profits.max())
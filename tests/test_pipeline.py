@@ -0,0 +1,38 @@
+import os
+
+from src.pipeline import Pipeline, Stage, library_modules
+
+
+def load(inputs):
+    from src.preprocessing import load_price_matrix
+
+    return load_price_matrix
+
+
+def report(inputs):
+    return len(inputs)
+
+
+def test_library_modules_follow_src_imports():
+    modules = library_modules(load)
+
+    assert {"src.preprocessing", "src.ingestion"} <= set(modules)
+    assert "src.optimization" not in modules
+    assert all(os.path.exists(path) for path in modules.values())
+    assert library_modules(report) == {}
+
+
+def test_fingerprint_changes_with_library_code(tmp_path):
+    pipeline = Pipeline(
+        [Stage("load", load), Stage("report", report, deps=["load"])],
+        artifact_dir=str(tmp_path),
+    )
+    before = {name: pipeline.fingerprint(name) for name in ("load", "report")}
+
+    # Pretend src/ingestion.py changed
+    path = library_modules(load)["src.ingestion"]
+    pipeline._fingerprints, pipeline._file_hashes = {}, {path: "edited"}
+    after = {name: pipeline.fingerprint(name) for name in ("load", "report")}
+
+    assert after["load"] != before["load"]
+    assert after["report"] != before["report"]